@@ -1,10 +1,15 @@
-from typing import Union
+import os
+import sys
 from ortools.sat.python import cp_model
 import matplotlib.pyplot as plt
 from matplotlib.patches import Rectangle
 import matplotlib
 
 matplotlib.use('Agg') 
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scheduling.model import build_model, fairness_bounds  # noqa: E402
+
 def scheduler() -> None:
     # Number of nurses, shifts, and days
     num_nurses = 5
@@ -33,57 +38,8 @@ def scheduler() -> None:
     ]
 
     # Create the model
-    model = cp_model.CpModel()
-
-    # Create shift variables
-    shifts = {}
-    for n in all_nurses:
-        for d in all_days:
-            for s in all_shifts:
-                shifts[(n, d, s)] = model.NewBoolVar(f"shift_n{n}_d{d}_s{s}")
-
-    # Each shift is assigned to exactly one nurse on each day
-    for d in all_days:
-        for s in all_shifts:
-            model.AddExactlyOne(shifts[(n, d, s)] for n in all_nurses)
-
-    # Each nurse works at most one shift per day
-    for n in all_nurses:
-        for d in all_days:
-            model.AddAtMostOne(shifts[(n, d, s)] for s in all_shifts)
-
-    # Distribute the shifts evenly among nurses
-    min_shifts_per_nurse = (num_shifts * num_days) // num_nurses
-    max_shifts_per_nurse = min_shifts_per_nurse + (1 if num_shifts * num_days % num_nurses != 0 else 0)
-    for n in all_nurses:
-        num_shifts_worked: Union[cp_model.LinearExpr, int] = 0
-        for d in all_days:
-            for s in all_shifts:
-                num_shifts_worked += shifts[(n, d, s)]
-        model.Add(min_shifts_per_nurse <= num_shifts_worked)
-        model.Add(num_shifts_worked <= max_shifts_per_nurse)
-
-    # Maximize the number of fulfilled shift requests
-    model.Maximize(
-        sum(
-            shift_requests[n][d][s] * shifts[(n, d, s)]
-            for n in all_nurses
-            for d in all_days
-            for s in all_shifts
-        )
-    )
-
-    # Add constraints for holiday requests
-    for n in all_nurses:
-        for d in all_days:
-            if holiday_requests[n][d] == 1:
-                for s in all_shifts:
-                    model.Add(shifts[(n, d, s)] == 0)
-
-    # Add constraint to prevent a nurse from working the last shift of day d and the first shift of day d+1
-    for n in all_nurses:
-        for d in range(num_days - 1):  # last day does not need this constraint
-            model.Add(shifts[(n, d, num_shifts - 1)] + shifts[(n, d + 1, 0)] <= 1)
+    model, shifts = build_model(num_nurses, num_shifts, num_days, shift_requests, holiday_requests)
+    min_shifts_per_nurse, _ = fairness_bounds(num_nurses, num_shifts, num_days)
 
     # Create the solver and solve
     solver = cp_model.CpSolver()
@@ -1,117 +1,338 @@
-from flask import Flask, request, jsonify
-from ortools.sat.python import cp_model
-import matplotlib.pyplot as plt
-from matplotlib.patches import Rectangle
-from typing import Union
+import json
+import os
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from flask import Flask, Response, g, request, jsonify, stream_with_context
+
+from scheduling.alternatives import alternatives_options, enumerate_alternatives
+from scheduling.backends import applies_symmetry_breaking, backend_options, solve_backend
+from scheduling.batch import MAX_BATCH_SIZE, BatchSolver
+from scheduling.cache import SolutionCache, problem_key
+from scheduling.feasibility import InfeasibleError, check_feasible, diagnose
+from scheduling.horizon import PARALLEL, horizon_options, solve_horizon
+from scheduling.incremental import apply_changes, parse_previous_schedule, resolve
+from scheduling.jobs import JobManager, QueueFullError
+from scheduling.metrics import CONTENT_TYPE, SIZE_BUCKETS, Registry
+from scheduling.model import roster_from_schedule
+from scheduling.payload import MIMETYPES, load_payload
+from scheduling.problem import parse_problem
+from scheduling.render import FORMATS, ScheduleRenderer
+from scheduling.solve import build_problem_model, solve, solver_options
+from scheduling.stream import stream_solve
+from scheduling.templates import default_cache as template_cache
+from scheduling.validate import validate_schedule
 
 app = Flask(__name__)
+# Bodies beyond this are answered with 413 before they are read.
+app.config["MAX_CONTENT_LENGTH"] = int(os.environ.get("SCHEDULE_MAX_BODY_BYTES", 64 * 1024 * 1024))
+job_manager = JobManager()
+batch_solver = BatchSolver()
+renderer = ScheduleRenderer()
+solution_cache = SolutionCache(path=os.environ.get("SCHEDULE_CACHE_PATH"))
+
+metrics = Registry()
+request_seconds = metrics.histogram("schedule_request_seconds", "Request latency by endpoint.", ["endpoint"])
+phase_seconds = metrics.histogram("schedule_phase_seconds", "Time spent per /schedule phase.", ["phase"])
+solves = metrics.counter("schedule_solves_total", "Solves by solver status.", ["status"])
+invalid_results = metrics.counter("schedule_invalid_results_total", "Schedules that break a hard rule, by source.",
+                                  ["source"])
+model_variables = metrics.histogram("schedule_model_variables", "Variables per solved model.", buckets=SIZE_BUCKETS)
+model_constraints = metrics.histogram("schedule_model_constraints", "Constraints per solved model.",
+                                      buckets=SIZE_BUCKETS)
+metrics.gauge("schedule_jobs_queue_depth", "Jobs submitted but not finished.", lambda: job_manager.queue_depth())
+metrics.gauge("schedule_template_cache_entries", "Cached model templates.", lambda: template_cache.stats()["entries"])
+metrics.gauge("schedule_solution_cache_hit_ratio", "Solution cache hit ratio.",
+              lambda: solution_cache.stats()["hit_ratio"] or 0)
+
+@app.before_request
+def start_timer():
+    g.started = time.perf_counter()
+
+@app.after_request
+def observe_latency(response):
+    request_seconds.observe(time.perf_counter() - g.started, endpoint=request.endpoint or "unknown")
+    return response
+
+def record_solve(result, timings=None):
+    """Count a fresh solve in the metrics and add its phases to ``timings``."""
+    solves.inc(status=result["solver_status"])
+    stats = result.get("stats")
+    if stats is not None:
+        model_variables.observe(stats["num_variables"])
+        model_constraints.observe(stats["num_constraints"])
+    phases = result.get("timings") or {"solve": result["wall_time"]}
+    for phase, seconds in phases.items():
+        phase_seconds.observe(seconds, phase=phase)
+    if timings is not None:
+        timings.update(phases)
+
+def with_diagnostics(response, result, timings):
+    """Add per-phase timings and solver stats when the client asked for ``?diagnostics=1``."""
+    if request.args.get("diagnostics", "").lower() in ("1", "true", "yes"):
+        response["timings"] = dict(timings, total=time.perf_counter() - g.started)
+        # A cached answer's stats describe the solve that produced it, not this request.
+        response["solver_stats"] = None if response.get("cached") else result.get("stats")
+    return response
 
-def visualize_schedule(sched, n_days, n_shifts, n_nurses):
-    x, y = zip(*[(day * n_shifts + shift, nurse) for nurse, day, shift in sched])
-    fig = plt.figure()
-    ax = fig.add_subplot(111)
-    ax.scatter(x, y)
-    width = 1
-    height = 1
-    colors = ['blue', 'red', 'green', 'orange', 'purple']
-    
-    for nurse, day, shift in sched:
-        color = colors[nurse % len(colors)]
-        ax.add_patch(Rectangle(
-            xy=((day * n_shifts + shift) - width / 2, nurse - height / 2),
-            width=width, height=height,
-            linewidth=1, color=color, fill=True))
-    
-    ax.axis('equal')
-    ax.set_xticks(range(n_days * n_shifts))
-    ax.set_yticks(range(n_nurses))
-    ax.set_xlabel("Shifts")
-    ax.set_ylabel("Nurses")
-    plt.savefig("schedule.png")
-    plt.close()  # Close the plot to prevent memory leaks
+def infeasible_response(error):
+    """422 with the screening issues that prove the problem infeasible before any solve."""
+    return jsonify({"error": str(error), "solver_status": "INFEASIBLE", "issues": error.issues}), 422
+
+def with_diagnosis(response, result, problem, options, wanted):
+    """Add a minimal conflicting set of holidays and fairness bounds to an infeasible answer."""
+    if wanted and result["solver_status"] == "INFEASIBLE":
+        started = time.perf_counter()
+        response["diagnosis"] = diagnose(problem, options)
+        phase_seconds.observe(time.perf_counter() - started, phase="diagnose")
+    return response
+
+def request_payload():
+    """The request body as a payload dict, from JSON or one of the binary formats."""
+    if request.mimetype in MIMETYPES:
+        return load_payload(request.get_data(), request.mimetype)
+    return request.json
+
+def schedule_response(result, problem=None):
+    schedule_id = roster = validation = None
+    if problem is not None and result["schedule"] is not None:
+        schedule_id = renderer.register(problem.num_nurses, problem.num_shifts, problem.num_days, result["schedule"])
+        roster = roster_from_schedule(result["schedule"], problem.num_days, problem.num_shifts).tolist()
+        # Cached schedules were checked on lookup, so whatever fails here was just solved.
+        validation = validate_schedule(result["schedule"], problem)
+        if validation["total"]:
+            invalid_results.inc(source="solve")
+    return {
+        "status": result["schedule"],
+        "roster": roster,
+        "validation": validation,
+        "schedule_id": schedule_id,
+        "solver_status": result["solver_status"],
+        "objective": result["objective"],
+        "bound": result["bound"],
+        "gap": result["gap"],
+        "wall_time": result["wall_time"],
+    }
 
 @app.route('/schedule', methods=['POST'])
 def solve_schedule():
-    data = request.json
+    timings = {}
 
     # Extract data
-    num_nurses = data['num_nurses']
-    num_shifts = data['num_shifts']
-    num_days = data['num_days']
-    all_nurses = range(num_nurses)
-    all_shifts = range(num_shifts)
-    all_days = range(num_days)
-    shift_requests = data['shift_requests']
-    holiday_requests = data['holiday_requests']
-
-    # Create the model
-    model = cp_model.CpModel()
-
-    # Create shift variables
-    shifts = {}
-    for n in range(num_nurses):
-        for d in range(num_days):
-            for s in range(num_shifts):
-                shifts[(n, d, s)] = model.NewBoolVar(f"shift_n{n}_d{d}_s{s}")
-
-    # Each shift is assigned to exactly one nurse on each day
-    for d in all_days:
-        for s in all_shifts:
-            model.AddExactlyOne(shifts[(n, d, s)] for n in all_nurses)
-
-    # Each nurse works at most one shift per day
-    for n in all_nurses:
-        for d in all_days:
-            model.AddAtMostOne(shifts[(n, d, s)] for s in all_shifts)
-
-    # Distribute the shifts evenly among nurses
-    min_shifts_per_nurse = (num_shifts * num_days) // num_nurses
-    max_shifts_per_nurse = min_shifts_per_nurse + (1 if num_shifts * num_days % num_nurses != 0 else 0)
-    for n in all_nurses:
-        num_shifts_worked: Union[cp_model.LinearExpr, int] = 0
-        for d in all_days:
-            for s in all_shifts:
-                num_shifts_worked += shifts[(n, d, s)]
-        model.Add(min_shifts_per_nurse <= num_shifts_worked)
-        model.Add(num_shifts_worked <= max_shifts_per_nurse)
-
-    # Maximize the number of fulfilled shift requests
-    model.Maximize(
-        sum(
-            shift_requests[n][d][s] * shifts[(n, d, s)]
-            for n in all_nurses
-            for d in all_days
-            for s in all_shifts
-        )
-    )
-
-    # Add constraints for holiday requests
-    for n in all_nurses:
-        for d in all_days:
-            if holiday_requests[n][d] == 1:
-                for s in all_shifts:
-                    model.Add(shifts[(n, d, s)] == 0)
-
-    # Add constraint to prevent a nurse from working the last shift of day d and the first shift of day d+1
-    for n in all_nurses:
-        for d in range(num_days - 1):  # last day does not need this constraint
-            model.Add(shifts[(n, d, num_shifts - 1)] + shifts[(n, d + 1, 0)] <= 1)
-
-    # Create the solver and solve
-    solver = cp_model.CpSolver()
-    status = solver.Solve(model)
-
-    # Visualize schedule
-    if status == cp_model.OPTIMAL:
-        sched = []
-        for d in range(num_days):
-            for n in range(num_nurses):
-                for s in range(num_shifts):
-                    if solver.Value(shifts[(n, d, s)]) == 1:
-                        sched.append((n, d, s))
-        #visualize_schedule(sched, num_days, num_shifts, num_nurses)
-
-    return jsonify({"status": sched})
+    try:
+        data = request_payload()
+        problem = parse_problem(data)
+        options = solver_options(data)
+        horizon = horizon_options(data)
+        backend = backend_options(data)
+        alternatives = alternatives_options(data)
+        if backend is not None and (horizon is not None or data.get("previous_schedule") is not None):
+            raise ValueError("'backend' can't be combined with 'horizon' or 'previous_schedule'")
+        if alternatives is not None and (backend is not None or horizon is not None
+                                         or data.get("previous_schedule") is not None):
+            raise ValueError("'alternatives' can't be combined with 'backend', 'horizon' or 'previous_schedule'")
+        if data.get("previous_schedule") is not None and (horizon is not None or options.get("symmetry_breaking")):
+            raise ValueError("'previous_schedule' can't be combined with 'horizon' or 'solver.symmetry_breaking'")
+        if options.get("symmetry_breaking") and (horizon is not None
+                                                 or backend is not None and not applies_symmetry_breaking(backend)):
+            raise ValueError("'solver.symmetry_breaking' can't be combined with 'horizon' or the annealing and lns "
+                             "backends")
+        if data.get("previous_schedule") is not None:
+            previous = parse_previous_schedule(data, problem)
+            problem, affected_days = apply_changes(data, problem, previous)
+        wants_diagnosis = data.get("diagnose", False)
+        if not isinstance(wants_diagnosis, bool):
+            raise ValueError("'diagnose' must be true or false")
+        check_feasible(problem)
+    except InfeasibleError as e:
+        return infeasible_response(e)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    timings["parse"] = time.perf_counter() - g.started
+    phase_seconds.observe(timings["parse"], phase="parse")
+
+    # Warm-start from the previous roster and move as few assignments as possible
+    if data.get("previous_schedule") is not None:
+        result = resolve(problem, previous, affected_days, options,
+                         pin_unaffected=bool(data.get("pin_unaffected")), template_cache=template_cache)
+        record_solve(result, timings)
+        response = schedule_response(result, problem)
+        response["moved"] = result.get("moved")
+        response["pinned_days"] = result["pinned_days"]
+        with_diagnosis(response, result, problem, options, wants_diagnosis)
+        return jsonify(with_diagnostics(response, result, timings))
+
+    # Identical problems and options are answered from the solution cache
+    started = time.perf_counter()
+    key_options = dict(options)
+    if horizon is not None:
+        key_options["horizon"] = horizon
+    if backend is not None:
+        key_options["backend"] = backend
+    if alternatives is not None:
+        key_options["alternatives"] = alternatives
+    key = problem_key(problem, key_options)
+    result = solution_cache.get(key)
+    if (result is not None and result["schedule"] is not None
+            and validate_schedule(result["schedule"], problem)["total"]):
+        # A stale or corrupted entry is solved again instead of being served
+        invalid_results.inc(source="cache")
+        result = None
+    timings["cache"] = time.perf_counter() - started
+    phase_seconds.observe(timings["cache"], phase="cache")
+    if result is None and horizon is not None:
+        # Long horizons are solved window by window and stitched together
+        executor = batch_solver.pool() if horizon["mode"] == PARALLEL else None
+        result = solve_horizon(problem, options, horizon, executor)
+        record_solve(result, timings)
+        solution_cache.put(key, result)
+        cached = False
+    elif result is None and backend is not None:
+        # Simulated annealing, CP-SAT with extra parameters, or a race between several
+        result = solve_backend(problem, options, backend)
+        record_solve(result, timings)
+        solution_cache.put(key, result)
+        cached = False
+    elif result is None:
+        # Create the model from the cached structural template for this shape
+        started = time.perf_counter()
+        model, shifts = build_problem_model(problem, template_cache, options.get("symmetry_breaking", False))
+        timings["build"] = time.perf_counter() - started
+        phase_seconds.observe(timings["build"], phase="build")
+
+        # Solve within the request's time budget and keep the best schedule found
+        result = solve(model, shifts, options)
+        if alternatives is not None and result["schedule"] is not None:
+            # One enumerating run over the same model, bounded by the objective just found
+            enumerate_alternatives(model, shifts, result, options, alternatives)
+        record_solve(result, timings)
+        solution_cache.put(key, result)
+        cached = False
+    else:
+        cached = True
+
+    response = schedule_response(result, problem)
+    response["cached"] = cached
+    if horizon is not None:
+        response["horizon"] = {"mode": result["mode"], "windows": result["windows"]}
+        if result.get("reason") is not None:
+            response["horizon"]["reason"] = result["reason"]
+    if backend is not None:
+        response["backend"] = {key: result.get(key) for key in ("backend", "winner", "members", "violations", "lns")
+                               if result.get(key) is not None}
+    if alternatives is not None:
+        response["alternatives"] = result.get("alternatives") or []
+    with_diagnosis(response, result, problem, options, wants_diagnosis)
+    return jsonify(with_diagnostics(response, result, timings))
+
+@app.route('/schedule/stream', methods=['POST'])
+def stream_schedule():
+    try:
+        data = request_payload()
+        problem = parse_problem(data)
+        options = solver_options(data)
+        check_feasible(problem)
+    except InfeasibleError as e:
+        return infeasible_response(e)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    model, shifts = build_problem_model(problem, template_cache, options.get("symmetry_breaking", False))
+
+    def generate():
+        for kind, payload in stream_solve(model, shifts, options):
+            if kind == "done":
+                record_solve(payload)
+                payload = schedule_response(payload, problem)
+            yield f"event: {kind}\ndata: {json.dumps(payload)}\n\n"
+
+    return Response(stream_with_context(generate()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.route('/schedule/<schedule_id>/image', methods=['GET'])
+def schedule_image(schedule_id):
+    fmt = request.args.get("format", "png")
+    if fmt not in FORMATS:
+        return jsonify({"error": f"'format' must be one of {', '.join(FORMATS)}"}), 400
+    future = renderer.image(schedule_id, fmt)
+    if future is None:
+        return jsonify({"error": "unknown schedule"}), 404
+    try:
+        image = future.result(timeout=5)
+    except FutureTimeoutError:
+        return jsonify({"state": "rendering"}), 202, {"Retry-After": "1"}
+    return Response(image, mimetype=FORMATS[fmt], headers={"Cache-Control": "public, max-age=86400, immutable"})
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    return Response(metrics.render(), mimetype="text/plain", content_type=CONTENT_TYPE)
+
+@app.route('/schedule/cache', methods=['GET'])
+def cache_stats():
+    return jsonify({"solutions": solution_cache.stats(), "templates": template_cache.stats()})
+
+def job_response(job):
+    info = job.to_dict()
+    if "result" in info:
+        stopped = info["result"].get("stopped")
+        info["result"] = schedule_response(info["result"], job.problem)
+        info["result"]["stopped"] = stopped
+    return info
+
+@app.route('/schedule/jobs', methods=['POST'])
+def submit_schedule_job():
+    try:
+        data = request_payload()
+        problem = parse_problem(data)
+        options = solver_options(data)
+        timeout = data.get("timeout")
+        if timeout is not None and (isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or timeout <= 0):
+            raise ValueError("'timeout' must be a positive number of seconds")
+        check_feasible(problem)
+    except InfeasibleError as e:
+        return infeasible_response(e)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        job = job_manager.submit(problem, options, timeout)
+    except QueueFullError as e:
+        return jsonify({"error": str(e)}), 429
+    return jsonify({"id": job.id, "state": job.state}), 202
+
+@app.route('/schedule/jobs/<job_id>', methods=['GET'])
+def get_schedule_job(job_id):
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": "unknown job"}), 404
+    return jsonify(job_response(job))
+
+@app.route('/schedule/jobs/<job_id>', methods=['DELETE'])
+def cancel_schedule_job(job_id):
+    job = job_manager.cancel(job_id)
+    if job is None:
+        return jsonify({"error": "unknown job"}), 404
+    return jsonify(job_response(job))
+
+@app.route('/schedule/batch', methods=['POST'])
+def solve_schedule_batch():
+    try:
+        data = request_payload()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    items = data.get("problems") if isinstance(data, dict) else None
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "'problems' must be a non-empty list of /schedule payloads"}), 400
+    if len(items) > MAX_BATCH_SIZE:
+        return jsonify({"error": f"at most {MAX_BATCH_SIZE} problems per batch"}), 400
+
+    def generate():
+        for record in batch_solver.solve(items):
+            if "result" in record:
+                record_solve(record["result"])
+                record["result"] = schedule_response(record["result"], record.pop("problem"))
+            yield json.dumps(record) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
 
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
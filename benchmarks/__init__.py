@@ -0,0 +1 @@
+"""Benchmarks for the worker scheduling models."""
@@ -0,0 +1,46 @@
+"""Wall-clock scaling of the parallel simulated-annealing sampler with worker count.
+
+Run from the repository root:
+
+    python -m benchmarks.annealing --size 10x2x14 --reads 256 --workers 1 2 4 8
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from benchmarks.model_build import random_instance
+from scheduling.annealing import parallel_sample
+from scheduling.problem import parse_problem
+from scheduling.qubo import build_qubo
+from scheduling.validate import hard_violations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", default="10x2x14", help="problem size as NURSESxSHIFTSxDAYS")
+    parser.add_argument("--reads", type=int, default=128)
+    parser.add_argument("--sweeps", type=int, default=1000)
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, 2, os.cpu_count() or 1}))
+    args = parser.parse_args()
+
+    num_nurses, num_shifts, num_days = (int(v) for v in args.size.split("x"))
+    shift_requests, holiday_requests = random_instance(num_nurses, num_shifts, num_days)
+    problem = parse_problem({"num_nurses": num_nurses, "num_shifts": num_shifts, "num_days": num_days,
+                             "shift_requests": shift_requests, "holiday_requests": holiday_requests})
+    bqm = build_qubo(problem)
+
+    print(f"{'workers':>7} {'wall (s)':>9} {'reads/s':>9} {'feasible':>9} {'best energy':>12}")
+    for workers in args.workers:
+        start = time.perf_counter()
+        sampleset = parallel_sample(bqm, num_reads=args.reads, num_workers=workers, num_sweeps=args.sweeps, seed=0)
+        elapsed = time.perf_counter() - start
+        labels = np.fromiter(sampleset.variables, dtype=np.int64)
+        feasible = hard_violations(sampleset.record.sample[:, np.argsort(labels)], problem) == 0
+        print(f"{workers:>7} {elapsed:>9.2f} {args.reads / elapsed:>9.1f} {feasible.mean():>9.1%} "
+              f"{sampleset.record.energy.min():>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
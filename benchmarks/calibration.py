@@ -0,0 +1,63 @@
+"""Calibrate the QUBO penalty weights for problem shapes and store them for the annealing backend.
+
+Run from the repository root:
+
+    python -m benchmarks.calibration --shapes 10x2x14 30x3x28 --output qubo_weights.json
+
+Each shape is calibrated on ``--instances`` generated problems with
+scheduling.calibration.calibrate. The best weights go into the JSON store
+unless no candidate gave a feasible read. Point ``QUBO_WEIGHTS_PATH`` at
+the file to use them at runtime.
+"""
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.instances import PROFILES, profile_instance
+from scheduling.calibration import PENALTIES, WeightStore, calibrate, tuned_weights
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--shapes", nargs="+", required=True, help="problem shapes as NURSESxSHIFTSxDAYS")
+    parser.add_argument("--output", default=os.environ.get("QUBO_WEIGHTS_PATH", "qubo_weights.json"))
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="loose")
+    parser.add_argument("--instances", type=int, default=4)
+    parser.add_argument("--candidates", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=2)
+    parser.add_argument("--reads", type=int, default=32)
+    parser.add_argument("--sweeps", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    store = WeightStore(args.output)
+    # Fail before calibrating, not when storing, if the file can't be updated.
+    store.profiles()
+    with ProcessPoolExecutor(max_workers=args.workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        for shape in args.shapes:
+            num_nurses, num_shifts, num_days = (int(v) for v in shape.split("x"))
+            problems = [profile_instance(args.profile, num_nurses, num_shifts, num_days, seed)
+                        for seed in range(args.instances)]
+            base = tuned_weights(problems[0], store=store)
+            ranked = calibrate(problems, base, args.candidates, args.rounds, args.reads, args.sweeps,
+                               executor=executor)
+            best = ranked[0]
+            start = next(summary for summary in ranked if summary["weights"] == base)
+            if best["feasibility_rate"] == 0:
+                print(f"{shape}: no candidate gave a feasible read ({best['mean_violations']:.1f} violations per "
+                      f"read at best), nothing stored; try more --sweeps or --rounds")
+                continue
+            stats = {key: value for key, value in best.items() if key != "weights"}
+            stats.update(instances=args.instances, num_reads=args.reads, num_sweeps=args.sweeps,
+                         profile=args.profile, calibrated_at=time.time())
+            store.put(num_nurses, num_shifts, num_days, best["weights"], stats)
+            line = (f"{shape}: {best['feasibility_rate']:.1%} feasible, {best['feasible_per_second']:.1f} feasible/s "
+                    f"with {dict(zip(PENALTIES, (getattr(best['weights'], name) for name in PENALTIES)))}")
+            line += f" (before: {start['feasibility_rate']:.1%}, {start['feasible_per_second']:.1f}/s)"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
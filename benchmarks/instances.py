@@ -0,0 +1,70 @@
+"""Seeded generator of synthetic nurse scheduling instances.
+
+``generate_instance`` builds a Problem of any size from a few knobs:
+
+* ``request_density``: share of (nurse, day) pairs with a shift request.
+  Requests go to each nurse's preferred shift ``preference`` of the time and
+  never fall on a holiday.
+* ``holiday_rate`` and ``holiday_block``: share of days off and the mean
+  length of a block of consecutive days off, because leave comes in runs
+  rather than as scattered single days.
+* ``coverage_slack``: how many nurses beyond ``num_shifts`` stay available on
+  each day, as a fraction of ``num_shifts``. Holidays are dropped at random
+  from days that would go below it. Low slack makes coverage tight.
+
+``PROFILES`` names the combinations the scaling benchmark uses.
+"""
+import math
+
+import numpy as np
+
+from scheduling.problem import Problem
+
+PROFILES = {
+    "loose": {"request_density": 0.1, "holiday_rate": 0.05, "holiday_block": 2.0, "coverage_slack": 1.0},
+    "dense": {"request_density": 0.4, "holiday_rate": 0.05, "holiday_block": 2.0, "coverage_slack": 1.0},
+    "tight": {"request_density": 0.2, "holiday_rate": 0.3, "holiday_block": 4.0, "coverage_slack": 0.0},
+}
+
+
+def _holidays(rng: np.random.Generator, num_nurses: int, num_days: int, rate: float, block: float) -> np.ndarray:
+    """Blocks of days off with geometric lengths, about ``rate`` of all days."""
+    holidays = np.zeros((num_nurses, num_days), dtype=np.int64)
+    if rate <= 0:
+        return holidays
+    num_blocks = rng.poisson(rate * num_days / block, size=num_nurses)
+    nurses = np.repeat(np.arange(num_nurses), num_blocks)
+    starts = rng.integers(0, num_days, size=nurses.size)
+    lengths = rng.geometric(1 / block, size=nurses.size)
+    offsets = np.arange(lengths.max(initial=0))
+    days = starts[:, None] + offsets
+    inside = (offsets < lengths[:, None]) & (days < num_days)
+    holidays[np.broadcast_to(nurses[:, None], days.shape)[inside], days[inside]] = 1
+    return holidays
+
+
+def generate_instance(num_nurses: int, num_shifts: int, num_days: int, seed: int = 0,
+                      request_density: float = 0.1, holiday_rate: float = 0.05, holiday_block: float = 2.0,
+                      coverage_slack: float = 1.0, preference: float = 0.7) -> Problem:
+    rng = np.random.default_rng(seed)
+    holidays = _holidays(rng, num_nurses, num_days, holiday_rate, holiday_block)
+
+    # Give days back until enough nurses are available to cover them.
+    required = min(num_nurses, num_shifts + math.ceil(coverage_slack * num_shifts))
+    for day in np.flatnonzero(num_nurses - holidays.sum(axis=0) < required):
+        off = np.flatnonzero(holidays[:, day])
+        excess = required - (num_nurses - off.size)
+        holidays[rng.choice(off, size=excess, replace=False), day] = 0
+
+    preferred = rng.integers(0, num_shifts, size=num_nurses)
+    other = (preferred[:, None] + rng.integers(1, max(num_shifts, 2), size=(num_nurses, num_days))) % num_shifts
+    shift = np.where(rng.random((num_nurses, num_days)) < preference, preferred[:, None], other)
+    requested = (rng.random((num_nurses, num_days)) < request_density) & (holidays == 0)
+    shift_requests = np.zeros((num_nurses, num_days, num_shifts), dtype=np.int64)
+    nurse, day = np.nonzero(requested)
+    shift_requests[nurse, day, shift[nurse, day]] = 1
+    return Problem(num_nurses, num_shifts, num_days, shift_requests, holidays)
+
+
+def profile_instance(profile: str, num_nurses: int, num_shifts: int, num_days: int, seed: int = 0) -> Problem:
+    return generate_instance(num_nurses, num_shifts, num_days, seed, **PROFILES[profile])
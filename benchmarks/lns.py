@@ -0,0 +1,76 @@
+"""Objective against wall time of large-neighborhood search and the monolithic CP-SAT model.
+
+Run from the repository root:
+
+    python -m benchmarks.lns --sizes 300x3x28 1000x3x28 --time-limit 60
+"""
+import argparse
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from ortools.sat.python import cp_model
+
+from benchmarks.instances import PROFILES, profile_instance
+from scheduling.lns import solve_lns
+from scheduling.model import build_model
+from scheduling.solve import make_solver
+
+
+class ObjectiveTrace(cp_model.CpSolverSolutionCallback):
+    """Record ``[elapsed, objective]`` for every improving solution."""
+
+    def __init__(self, started: float):
+        cp_model.CpSolverSolutionCallback.__init__(self)
+        self.started = started
+        self.trace = []
+
+    def on_solution_callback(self):
+        self.trace.append([time.perf_counter() - self.started, self.ObjectiveValue()])
+
+
+def monolithic_trace(problem, options) -> list:
+    started = time.perf_counter()
+    model, _ = build_model(problem.num_nurses, problem.num_shifts, problem.num_days,
+                           problem.shift_requests, problem.holiday_requests)
+    callback = ObjectiveTrace(started)
+    make_solver(options).Solve(model, callback)
+    return callback.trace
+
+
+def objective_at(trace: list, seconds: float):
+    """The best objective reached within ``seconds``, or None."""
+    reached = [objective for elapsed, objective in trace if elapsed <= seconds]
+    return max(reached) if reached else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", default=["200x3x28", "1000x3x28"],
+                        help="problem sizes as NURSESxSHIFTSxDAYS")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="dense")
+    parser.add_argument("--time-limit", type=float, default=60.0)
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--nurses", type=int, default=50)
+    parser.add_argument("--sub-time-limit", type=float, default=2.0)
+    args = parser.parse_args()
+    options = {"time_limit": args.time_limit, "num_search_workers": args.workers, "relative_gap": 0.0}
+    lns = {"days": args.days, "nurses": args.nurses, "sub_time_limit": args.sub_time_limit,
+           "max_iterations": 100000, "seed": 0}
+    checkpoints = [t for t in (1, 2, 5, 10, 30, 60, 120, 300) if t <= args.time_limit]
+
+    print(f"{'size':>12} {'method':>10} " + " ".join(f"{f'{t}s':>8}" for t in checkpoints))
+    with ProcessPoolExecutor(args.workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        for size in args.sizes:
+            num_nurses, num_shifts, num_days = (int(v) for v in size.split("x"))
+            problem = profile_instance(args.profile, num_nurses, num_shifts, num_days)
+            lns_trace = [[elapsed, objective] for elapsed, objective, violations
+                         in solve_lns(problem, options, lns, executor)["lns"]["trace"] if violations == 0]
+            for method, trace in (("cpsat", monolithic_trace(problem, options)), ("lns", lns_trace)):
+                cells = [objective_at(trace, t) for t in checkpoints]
+                print(f"{size:>12} {method:>10} " + " ".join(f"{'-' if c is None else f'{c:.0f}':>8}" for c in cells))
+
+
+if __name__ == "__main__":
+    main()
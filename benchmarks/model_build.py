@@ -0,0 +1,103 @@
+"""Compare CP-SAT model build time of the array builder with the original loops.
+
+Run from the repository root:
+
+    python -m benchmarks.model_build
+"""
+import argparse
+import time
+from typing import Union
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+from scheduling.model import build_model
+
+
+def legacy_build(num_nurses, num_shifts, num_days, shift_requests, holiday_requests):
+    """The dict-of-tuples builder that app.py used before scheduling.model."""
+    all_nurses = range(num_nurses)
+    all_shifts = range(num_shifts)
+    all_days = range(num_days)
+    model = cp_model.CpModel()
+
+    shifts = {}
+    for n in all_nurses:
+        for d in all_days:
+            for s in all_shifts:
+                shifts[(n, d, s)] = model.NewBoolVar(f"shift_n{n}_d{d}_s{s}")
+
+    for d in all_days:
+        for s in all_shifts:
+            model.AddExactlyOne(shifts[(n, d, s)] for n in all_nurses)
+
+    for n in all_nurses:
+        for d in all_days:
+            model.AddAtMostOne(shifts[(n, d, s)] for s in all_shifts)
+
+    min_shifts_per_nurse = (num_shifts * num_days) // num_nurses
+    max_shifts_per_nurse = min_shifts_per_nurse + (1 if num_shifts * num_days % num_nurses != 0 else 0)
+    for n in all_nurses:
+        num_shifts_worked: Union[cp_model.LinearExpr, int] = 0
+        for d in all_days:
+            for s in all_shifts:
+                num_shifts_worked += shifts[(n, d, s)]
+        model.Add(min_shifts_per_nurse <= num_shifts_worked)
+        model.Add(num_shifts_worked <= max_shifts_per_nurse)
+
+    model.Maximize(
+        sum(
+            shift_requests[n][d][s] * shifts[(n, d, s)]
+            for n in all_nurses
+            for d in all_days
+            for s in all_shifts
+        )
+    )
+
+    for n in all_nurses:
+        for d in all_days:
+            if holiday_requests[n][d] == 1:
+                for s in all_shifts:
+                    model.Add(shifts[(n, d, s)] == 0)
+
+    for n in all_nurses:
+        for d in range(num_days - 1):
+            model.Add(shifts[(n, d, num_shifts - 1)] + shifts[(n, d + 1, 0)] <= 1)
+
+    return model, shifts
+
+
+def random_instance(num_nurses, num_shifts, num_days, seed=0):
+    rng = np.random.default_rng(seed)
+    shift_requests = (rng.random((num_nurses, num_days, num_shifts)) < 0.1).astype(int).tolist()
+    holiday_requests = (rng.random((num_nurses, num_days)) < 0.05).astype(int).tolist()
+    return shift_requests, holiday_requests
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", default=["5x3x7", "50x3x30", "300x3x90"],
+                        help="problem sizes as NURSESxSHIFTSxDAYS")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'size':>12} {'variables':>10} {'loops (s)':>10} {'array (s)':>10} {'speedup':>8}")
+    for size in args.sizes:
+        num_nurses, num_shifts, num_days = (int(v) for v in size.split("x"))
+        instance = (num_nurses, num_shifts, num_days, *random_instance(num_nurses, num_shifts, num_days))
+        legacy = best_of(lambda: legacy_build(*instance), args.repeat)
+        array = best_of(lambda: build_model(*instance), args.repeat)
+        print(f"{size:>12} {num_nurses * num_shifts * num_days:>10} {legacy:>10.3f} {array:>10.3f} {legacy / array:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Compare QUBO build time and peak memory of the NumPy builder with the dict loops.
+
+Run from the repository root:
+
+    python -m benchmarks.qubo_build --sizes 5x2x7 100x3x90
+"""
+import argparse
+import time
+import tracemalloc
+from collections import defaultdict
+
+import numpy as np
+from dimod import BinaryQuadraticModel
+
+from benchmarks.model_build import random_instance
+from scheduling.problem import parse_problem
+from scheduling.qubo import QuboWeights, build_qubo
+
+
+def dict_build(problem, weights=QuboWeights()):
+    """The defaultdict builder from Dwave/work_schedule_dwave.py, fed from a payload."""
+    n_nurses, n_days, n_shifts = problem.num_nurses, problem.num_days, problem.num_shifts
+    w = weights
+    min_duty_days = int(n_days * n_shifts / n_nurses)
+
+    def get_index(nurse_index, day_index, shift_index):
+        return nurse_index * n_days * n_shifts + day_index * n_shifts + shift_index
+
+    Q = defaultdict(int)
+    for nurse in range(n_nurses):
+        for day in range(n_days):
+            for shift in range(n_shifts - 1):
+                Q[get_index(nurse, day, shift), get_index(nurse, day, shift + 1)] = w.a
+    for nurse in range(n_nurses):
+        for day in range(n_days - 1):
+            Q[get_index(nurse, day, n_shifts - 1), get_index(nurse, day + 1, 0)] = w.a
+    for day in range(n_days):
+        for shift in range(n_shifts):
+            for nurse1 in range(n_nurses):
+                ind1 = get_index(nurse1, day, shift)
+                Q[ind1, ind1] += w.lagrange_hard_shift * (w.effort ** 2 - 2 * w.workforce * w.effort)
+                for nurse2 in range(nurse1 + 1, n_nurses):
+                    Q[ind1, get_index(nurse2, day, shift)] += 2 * w.lagrange_hard_shift * w.effort ** 2
+    for nurse in range(n_nurses):
+        for day in range(n_days):
+            for shift in range(n_shifts):
+                ind = get_index(nurse, day, shift)
+                Q[ind, ind] += w.lagrange_soft_nurse * (w.preference ** 2 - 2 * min_duty_days * w.preference)
+                for other_shift in range(shift + 1, n_shifts):
+                    Q[ind, get_index(nurse, day, other_shift)] += 2 * w.lagrange_soft_nurse * w.preference ** 2
+    for nurse in range(n_nurses):
+        for day in range(n_days):
+            if problem.holiday_requests[nurse][day] == 1:
+                for shift in range(n_shifts):
+                    Q[get_index(nurse, day, shift), get_index(nurse, day, shift)] += w.penalty_off_day
+            for shift in range(n_shifts):
+                ind = get_index(nurse, day, shift)
+                Q[ind, ind] -= w.request_bonus * problem.shift_requests[nurse][day][shift]
+
+    e_offset = (w.lagrange_hard_shift * n_days * n_shifts * w.workforce ** 2
+                + w.lagrange_soft_nurse * n_nurses * min_duty_days ** 2)
+    return BinaryQuadraticModel.from_qubo(Q, offset=e_offset)
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def same_bqm(a, b):
+    order = sorted(a.variables)
+    ca, cb = a.to_numpy_vectors(order), b.to_numpy_vectors(order)
+    qa = {(min(i, j), max(i, j)): v for i, j, v in zip(*ca[1])}
+    qb = {(min(i, j), max(i, j)): v for i, j, v in zip(*cb[1])}
+    return (np.allclose(ca[0], cb[0]) and np.isclose(a.offset, b.offset) and qa.keys() == qb.keys()
+            and all(np.isclose(qa[k], qb[k]) for k in qa))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", default=["5x2x7", "50x3x30", "100x3x90"],
+                        help="problem sizes as NURSESxSHIFTSxDAYS")
+    parser.add_argument("--check", action="store_true", help="verify both builders give the same BQM")
+    args = parser.parse_args()
+    weights = QuboWeights(request_bonus=0.25)
+
+    print(f"{'size':>10} {'variables':>9} {'terms':>10} {'dict (s)':>9} {'dict MB':>8} "
+          f"{'numpy (s)':>9} {'numpy MB':>8} {'speedup':>8}")
+    for size in args.sizes:
+        num_nurses, num_shifts, num_days = (int(v) for v in size.split("x"))
+        shift_requests, holiday_requests = random_instance(num_nurses, num_shifts, num_days)
+        problem = parse_problem({"num_nurses": num_nurses, "num_shifts": num_shifts, "num_days": num_days,
+                                 "shift_requests": shift_requests, "holiday_requests": holiday_requests})
+        reference, dict_time, dict_peak = measure(lambda: dict_build(problem, weights))
+        bqm, numpy_time, numpy_peak = measure(lambda: build_qubo(problem, weights))
+        if args.check and not same_bqm(reference, bqm):
+            raise SystemExit(f"{size}: builders disagree")
+        print(f"{size:>10} {bqm.num_variables:>9} {bqm.num_interactions:>10} {dict_time:>9.3f} "
+              f"{dict_peak / 2 ** 20:>8.1f} {numpy_time:>9.3f} {numpy_peak / 2 ** 20:>8.1f} "
+              f"{dict_time / numpy_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Quality loss of the rolling-horizon modes against the monolithic CP-SAT solve.
+
+Run from the repository root:
+
+    python -m benchmarks.rolling_horizon --sizes 30x3x84 60x3x182
+"""
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.model_build import random_instance
+from scheduling.horizon import solve_parallel, solve_sequential
+from scheduling.problem import parse_problem
+from scheduling.solve import solve_problem
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", default=["20x3x56", "30x3x84"],
+                        help="problem sizes as NURSESxSHIFTSxDAYS")
+    parser.add_argument("--seeds", type=int, default=3)
+    parser.add_argument("--window", type=int, default=14)
+    parser.add_argument("--overlap", type=int, default=7)
+    parser.add_argument("--time-limit", type=float, default=30.0)
+    args = parser.parse_args()
+    options = {"time_limit": args.time_limit, "num_search_workers": 1, "relative_gap": 0.0}
+
+    print(f"{'size':>10} {'seed':>4} {'monolithic':>16} {'sequential':>22} {'parallel':>22}")
+    with ProcessPoolExecutor() as executor:
+        for size in args.sizes:
+            num_nurses, num_shifts, num_days = (int(v) for v in size.split("x"))
+            for seed in range(args.seeds):
+                shift_requests, holiday_requests = random_instance(num_nurses, num_shifts, num_days, seed)
+                problem = parse_problem({"num_nurses": num_nurses, "num_shifts": num_shifts, "num_days": num_days,
+                                         "shift_requests": shift_requests, "holiday_requests": holiday_requests})
+                runs = [
+                    lambda: solve_problem(problem, options),
+                    lambda: solve_sequential(problem, options, args.window, args.overlap),
+                    lambda: solve_parallel(problem, options, args.window, executor),
+                ]
+                cells = []
+                for run in runs:
+                    start = time.perf_counter()
+                    result = run()
+                    elapsed = time.perf_counter() - start
+                    if result is None or result["objective"] is None:
+                        cells.append(None)
+                    else:
+                        cells.append((result["objective"], elapsed))
+                mono = cells[0][0] if cells[0] else None
+                row = [f"{cells[0][0]:>6.0f} {cells[0][1]:>7.2f}s" if cells[0] else f"{'-':>16}"]
+                for cell in cells[1:]:
+                    if cell is None:
+                        row.append(f"{'-':>22}")
+                    else:
+                        loss = f"{100 * (mono - cell[0]) / mono:>5.1f}%" if mono else "   n/a"
+                        row.append(f"{cell[0]:>6.0f} {cell[1]:>7.2f}s {loss}")
+                print(f"{size:>10} {seed:>4} {row[0]:>16} {row[1]:>22} {row[2]:>22}")
+
+
+if __name__ == "__main__":
+    main()
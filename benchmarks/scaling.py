@@ -0,0 +1,198 @@
+"""Scaling benchmark of the CP-SAT and simulated-annealing backends.
+
+Run from the repository root:
+
+    python -m benchmarks.scaling run --sizes 20x3x28 100x3x90 --profiles loose tight --output base.json
+    python -m benchmarks.scaling compare base.json new.json
+
+``run`` solves a generated instance (see benchmarks/instances.py) for every
+backend, size, profile and seed. It records build time, solve time,
+objective, gap and peak RSS to a JSON file. Every case runs in a fresh
+process, so the peak RSS belongs to that case alone. ``compare`` matches the
+cases of two result files and exits with status 1 if the new run regressed.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from benchmarks.instances import PROFILES, profile_instance
+
+CPSAT = "cpsat"
+SA = "sa"
+BACKENDS = (CPSAT, SA)
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    unit = 1 if sys.platform == "darwin" else 1024
+    peak = max(resource.getrusage(who).ru_maxrss for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN))
+    return peak * unit / 2 ** 20
+
+
+def _run_cpsat(problem, settings: dict) -> dict:
+    from scheduling.solve import build_problem_model, solve
+    from scheduling.templates import ModelTemplateCache
+
+    options = {"time_limit": settings["time_limit"], "num_search_workers": settings["workers"], "relative_gap": 0.0}
+    start = time.perf_counter()
+    model, shifts = build_problem_model(problem, ModelTemplateCache())
+    build_time = time.perf_counter() - start
+    result = solve(model, shifts, options)
+    return {"build_time": build_time, "solve_time": result["wall_time"], "status": result["solver_status"],
+            "objective": result["objective"], "bound": result["bound"], "gap": result["gap"]}
+
+
+def _run_sa(problem, settings: dict) -> dict:
+    from scheduling.annealing import parallel_sample, top_k
+    from scheduling.qubo import build_qubo
+
+    start = time.perf_counter()
+    bqm = build_qubo(problem)
+    build_time = time.perf_counter() - start
+    start = time.perf_counter()
+    sampleset = parallel_sample(bqm, num_reads=settings["reads"], num_workers=settings["workers"],
+                                num_sweeps=settings["sweeps"], seed=0)
+    solve_time = time.perf_counter() - start
+    best = top_k(sampleset, problem)[0]
+    assigned = np.zeros(problem.shift_requests.shape, dtype=bool)
+    if best["schedule"]:
+        assigned[tuple(np.asarray(best["schedule"]).T)] = True
+    return {"build_time": build_time, "solve_time": solve_time,
+            "status": "FEASIBLE" if best["feasible"] else "UNKNOWN",
+            "objective": int((problem.shift_requests * assigned).sum()), "bound": None, "gap": None,
+            "energy": best["energy"], "violations": best["violations"]}
+
+
+def run_case(backend: str, size: str, profile: str, seed: int, settings: dict) -> dict:
+    num_nurses, num_shifts, num_days = (int(v) for v in size.split("x"))
+    problem = profile_instance(profile, num_nurses, num_shifts, num_days, seed)
+    record = {"backend": backend, "size": size, "profile": profile, "seed": seed,
+              "variables": num_nurses * num_shifts * num_days}
+    record.update((_run_cpsat if backend == CPSAT else _run_sa)(problem, settings))
+    record["peak_rss_mb"] = _peak_rss_mb()
+    return record
+
+
+def _environment() -> dict:
+    from ortools import __version__ as ortools_version
+    return {"python": platform.python_version(), "platform": platform.platform(), "cpu_count": os.cpu_count(),
+            "ortools": ortools_version, "numpy": np.__version__}
+
+
+def run(args) -> None:
+    settings = {"time_limit": args.time_limit, "workers": args.workers, "reads": args.reads, "sweeps": args.sweeps}
+    results = []
+    print(f"{'backend':>7} {'size':>10} {'profile':>7} {'seed':>4} {'build (s)':>9} {'solve (s)':>9} "
+          f"{'status':>10} {'objective':>9} {'gap':>7} {'rss (MB)':>8}")
+    context = multiprocessing.get_context("spawn")
+    for backend in args.backends:
+        for size in args.sizes:
+            for profile in args.profiles:
+                for seed in range(args.seeds):
+                    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                        record = executor.submit(run_case, backend, size, profile, seed, settings).result()
+                    results.append(record)
+                    gap = "-" if record["gap"] is None else f"{record['gap']:.2%}"
+                    print(f"{backend:>7} {size:>10} {profile:>7} {seed:>4} {record['build_time']:>9.3f} "
+                          f"{record['solve_time']:>9.3f} {record['status']:>10} {record['objective']!s:>9} "
+                          f"{gap:>7} {record['peak_rss_mb']:>8.0f}")
+    with open(args.output, "w") as f:
+        json.dump({"created": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "environment": _environment(),
+                   "settings": settings, "results": results}, f, indent=2)
+    print(f"wrote {len(results)} results to {args.output}")
+
+
+STATUS_RANK = {"OPTIMAL": 3, "FEASIBLE": 2, "UNKNOWN": 1, "MODEL_INVALID": 0, "INFEASIBLE": 0}
+
+
+def regressions(base: dict, new: dict, time_tolerance: float, min_seconds: float, rss_tolerance: float) -> list:
+    """Reasons the ``new`` record is worse than ``base``; empty when it is not."""
+    found = []
+    if STATUS_RANK.get(new["status"], 0) < STATUS_RANK.get(base["status"], 0):
+        found.append(f"status {base['status']} -> {new['status']}")
+    if base["objective"] is not None and (new["objective"] is None or new["objective"] < base["objective"]):
+        found.append(f"objective {base['objective']} -> {new['objective']}")
+    if new.get("violations", 0) > base.get("violations", 0):
+        found.append(f"violations {base['violations']} -> {new['violations']}")
+    for key in ("build_time", "solve_time"):
+        if new[key] > base[key] * (1 + time_tolerance) and new[key] - base[key] > min_seconds:
+            found.append(f"{key} {base[key]:.3f}s -> {new[key]:.3f}s")
+    if new["peak_rss_mb"] > base["peak_rss_mb"] * (1 + rss_tolerance):
+        found.append(f"peak_rss {base['peak_rss_mb']:.0f}MB -> {new['peak_rss_mb']:.0f}MB")
+    return found
+
+
+def compare(args) -> int:
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+
+    def case(record):
+        return record["backend"], record["size"], record["profile"], record["seed"]
+
+    base_cases = {case(record): record for record in base["results"]}
+    failed = 0
+    print(f"{'backend':>7} {'size':>10} {'profile':>7} {'seed':>4} {'build':>7} {'solve':>7} {'objective':>12}  verdict")
+    for record in new["results"]:
+        before = base_cases.pop(case(record), None)
+        if before is None:
+            print(f"{record['backend']:>7} {record['size']:>10} {record['profile']:>7} {record['seed']:>4}  new case")
+            continue
+        found = regressions(before, record, args.time_tolerance, args.min_seconds, args.rss_tolerance)
+        failed += bool(found)
+        build = record["build_time"] / max(before["build_time"], 1e-9)
+        solve = record["solve_time"] / max(before["solve_time"], 1e-9)
+        print(f"{record['backend']:>7} {record['size']:>10} {record['profile']:>7} {record['seed']:>4} "
+              f"{build:>6.2f}x {solve:>6.2f}x {before['objective']!s:>5} -> {record['objective']!s:<5} "
+              f"{'REGRESSION: ' + '; '.join(found) if found else 'ok'}")
+    for missing in base_cases:
+        print(f"{missing[0]:>7} {missing[1]:>10} {missing[2]:>7} {missing[3]:>4}  missing from new run")
+    print(f"{failed} regression(s)")
+    return 1 if failed else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the size grid and write a results file")
+    run_parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    run_parser.add_argument("--sizes", nargs="+", default=["10x3x14", "50x3x28", "200x3x90"],
+                            help="problem sizes as NURSESxSHIFTSxDAYS")
+    run_parser.add_argument("--profiles", nargs="+", choices=sorted(PROFILES), default=["loose", "tight"])
+    run_parser.add_argument("--seeds", type=int, default=1)
+    run_parser.add_argument("--time-limit", type=float, default=30.0, help="CP-SAT time limit per case")
+    run_parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                            help="CP-SAT search workers and annealing processes")
+    run_parser.add_argument("--reads", type=int, default=64, help="annealing reads per case")
+    run_parser.add_argument("--sweeps", type=int, default=1000, help="annealing sweeps per read")
+    run_parser.add_argument("--output", default="scaling.json")
+
+    compare_parser = commands.add_parser("compare", help="flag regressions of NEW against BASE")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--time-tolerance", type=float, default=0.2,
+                                help="allowed relative slowdown of build and solve time")
+    compare_parser.add_argument("--min-seconds", type=float, default=0.05,
+                                help="ignore slowdowns smaller than this many seconds")
+    compare_parser.add_argument("--rss-tolerance", type=float, default=0.2,
+                                help="allowed relative growth of peak RSS")
+
+    args = parser.parse_args()
+    if args.command == "run":
+        run(args)
+    else:
+        sys.exit(compare(args))
+
+
+if __name__ == "__main__":
+    main()
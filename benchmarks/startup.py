@@ -0,0 +1,73 @@
+"""Import time of the app and time to first response of the preforking server.
+
+Run from the repository root:
+
+    python -m benchmarks.startup --workers 1 4
+"""
+import argparse
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+EXAMPLE = {
+    "num_nurses": 3, "num_shifts": 1, "num_days": 3,
+    "shift_requests": [[[1], [0], [0]], [[0], [1], [0]], [[0], [0], [1]]],
+    "holiday_requests": [[0, 0, 0], [0, 0, 0], [0, 0, 0]],
+}
+
+
+def import_seconds(module: str) -> float:
+    """Wall time of importing ``module`` in a fresh interpreter."""
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    return float(subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def first_response_seconds(workers: int, timeout: float = 60.0) -> float:
+    """Seconds from starting serve.py until a /schedule request succeeds."""
+    port = free_port()
+    request = urllib.request.Request(f"http://127.0.0.1:{port}/schedule", data=json.dumps(EXAMPLE).encode(),
+                                     headers={"Content-Type": "application/json"})
+    started = time.perf_counter()
+    server = subprocess.Popen([sys.executable, "serve.py", "--port", str(port), "--workers", str(workers)],
+                              stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(request, timeout=timeout) as response:
+                    response.read()
+                return time.perf_counter() - started
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.01)
+        raise TimeoutError(f"no response within {timeout}s")
+    finally:
+        os.kill(server.pid, signal.SIGTERM)
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 4])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for module in ("scheduling.render", "app"):
+        print(f"import {module:<18} {min(import_seconds(module) for _ in range(args.repeat)):>7.3f}s")
+    for workers in args.workers:
+        best = min(first_response_seconds(workers) for _ in range(args.repeat))
+        print(f"first response, {workers:>2} workers {best:>7.3f}s")
+
+
+if __name__ == "__main__":
+    main()
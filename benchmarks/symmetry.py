@@ -0,0 +1,50 @@
+"""Time to OPTIMAL with and without symmetry breaking on instances with interchangeable nurses.
+
+Run from the repository root:
+
+    python -m benchmarks.symmetry --sizes 12x3x14 20x3x28 --blank 0.6
+"""
+import argparse
+
+import numpy as np
+
+from benchmarks.model_build import random_instance
+from scheduling.problem import parse_problem
+from scheduling.solve import solve_problem
+from scheduling.symmetry import interchangeable_groups
+from scheduling.templates import ModelTemplateCache
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", default=["12x3x14", "20x3x28"],
+                        help="problem sizes as NURSESxSHIFTSxDAYS")
+    parser.add_argument("--blank", type=float, default=0.6,
+                        help="share of nurses with no shift or holiday requests")
+    parser.add_argument("--seeds", type=int, default=3)
+    parser.add_argument("--time-limit", type=float, default=60.0)
+    args = parser.parse_args()
+
+    print(f"{'size':>10} {'seed':>4} {'sym':>7} {'off status':>10} {'off (s)':>8} {'on status':>10} {'on (s)':>8}")
+    for size in args.sizes:
+        num_nurses, num_shifts, num_days = (int(v) for v in size.split("x"))
+        for seed in range(args.seeds):
+            shift_requests, holiday_requests = (np.asarray(a) for a in random_instance(num_nurses, num_shifts, num_days, seed))
+            blank = np.random.default_rng(seed).random(num_nurses) < args.blank
+            shift_requests[blank] = 0
+            holiday_requests[blank] = 0
+            problem = parse_problem({"num_nurses": num_nurses, "num_shifts": num_shifts, "num_days": num_days,
+                                     "shift_requests": shift_requests.tolist(),
+                                     "holiday_requests": holiday_requests.tolist()})
+            row = [f"{size:>10} {seed:>4} {sum(len(g) for g in interchangeable_groups(problem)):>7}"]
+            for symmetry_breaking in (False, True):
+                options = {"time_limit": args.time_limit, "num_search_workers": 1, "relative_gap": 0.0}
+                if symmetry_breaking:
+                    options["symmetry_breaking"] = True
+                result = solve_problem(problem, options, ModelTemplateCache())
+                row.append(f"{result['solver_status']:>10} {result['wall_time']:>8.2f}")
+            print(" ".join(row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Compare the vectorized schedule validator with the list-based D-Wave checks.
+
+Run from the repository root:
+
+    python -m benchmarks.validate --sizes 5x2x7 100x2x90 300x2x365
+"""
+import argparse
+
+from benchmarks.instances import profile_instance
+from benchmarks.model_build import best_of
+from scheduling.lns import greedy_roster
+from scheduling.model import schedule_from_assignments
+from scheduling.validate import validate_schedule
+
+
+def legacy_checks(sched, n_nurses, n_days, n_shifts):
+    """The checks Dwave/work_schedule_dwave.py used before scheduling.validate (two shifts only)."""
+    satisfied = [[False] * n_shifts for _ in range(n_days)]
+    for _, day, shift in sched:
+        satisfied[day][shift] = True
+    hard_shift = all(all(shift for shift in day) for day in satisfied)
+
+    hard_nurse = [True] * n_nurses
+    for nurse, day, shift in sched:
+        if (shift == 0 and ((nurse, day, 1) in sched or (nurse, day - 1, 1) in sched)) or \
+           (shift == 1 and ((nurse, day, 0) in sched or (nurse, day + 1, 0) in sched)):
+            hard_nurse[nurse] = False
+
+    num_shifts = [0] * n_nurses
+    for nurse, _, _ in sched:
+        num_shifts[nurse] += 1
+    soft_nurse = num_shifts.count(num_shifts[0]) == len(num_shifts)
+    return hard_shift, all(hard_nurse), soft_nurse
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", default=["5x2x7", "100x2x90", "300x2x365"],
+                        help="problem sizes as NURSESxSHIFTSxDAYS")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'size':>12} {'assigned':>9} {'lists (s)':>10} {'numpy (s)':>10} {'speedup':>8}")
+    for size in args.sizes:
+        num_nurses, num_shifts, num_days = (int(v) for v in size.split("x"))
+        problem = profile_instance("loose", num_nurses, num_shifts, num_days)
+        sched = schedule_from_assignments(greedy_roster(problem))
+        legacy = best_of(lambda: legacy_checks(sched, num_nurses, num_days, num_shifts), args.repeat)
+        vectorized = best_of(lambda: validate_schedule(sched, problem), args.repeat)
+        print(f"{size:>12} {len(sched):>9} {legacy:>10.4f} {vectorized:>10.4f} {legacy / vectorized:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Shared building blocks for the worker scheduling API and scripts."""
@@ -0,0 +1,116 @@
+"""Several distinct optimal or near-optimal rosters for planners to choose from.
+
+Clients may pass an optional ``"alternatives"`` object with the payload:
+
+    {"count": 5, "max_loss": 1, "time_limit": 10}
+
+After the usual solve, a clone of the same model without its objective gets
+a constraint instead: at most ``max_loss`` fulfilled requests below the best
+objective found. A single enumerating CP-SAT run, hinted with the best roster, then
+collects up to ``count`` distinct rosters and stops. With ``max_loss`` 0 and
+an optimal first solve, every alternative is optimal too.
+"""
+import math
+import time
+from typing import Optional
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+from scheduling.model import assignments_from_solution, schedule_from_assignments, var_indices
+from scheduling.solve import MAX_TIME_LIMIT, make_solver
+
+MAX_COUNT = 100
+DEFAULT_TIME_LIMIT = 10.0
+
+
+def alternatives_options(data: dict) -> Optional[dict]:
+    """Validate the optional ``"alternatives"`` payload entry; None means a single roster."""
+    raw = data.get("alternatives")
+    if raw is None:
+        return None
+    if not isinstance(raw, dict):
+        raise ValueError("'alternatives' must be an object")
+    count = raw.get("count", 5)
+    max_loss = raw.get("max_loss", 0)
+    time_limit = raw.get("time_limit", DEFAULT_TIME_LIMIT)
+    if isinstance(count, bool) or not isinstance(count, int) or not 1 <= count <= MAX_COUNT:
+        raise ValueError(f"'alternatives.count' must be an integer in [1, {MAX_COUNT}]")
+    if isinstance(max_loss, bool) or not isinstance(max_loss, (int, float)) or max_loss < 0:
+        raise ValueError("'alternatives.max_loss' must be a non-negative number")
+    if isinstance(time_limit, bool) or not isinstance(time_limit, (int, float)) or not 0 < time_limit <= MAX_TIME_LIMIT:
+        raise ValueError(f"'alternatives.time_limit' must be in (0, {MAX_TIME_LIMIT}] seconds")
+    return {"count": count, "max_loss": max_loss, "time_limit": float(time_limit)}
+
+
+class SolutionCollector(cp_model.CpSolverSolutionCallback):
+    """Keep the distinct ``[n, d, s]`` assignments found, and stop at ``limit``."""
+
+    def __init__(self, shifts: np.ndarray, objective, limit: int, seen: set):
+        cp_model.CpSolverSolutionCallback.__init__(self)
+        self._index = var_indices(shifts)
+        self._objective_vars = np.asarray(objective.vars, dtype=np.int64)
+        self._objective_coeffs = np.asarray(objective.coeffs, dtype=np.int64)
+        self._scale = objective.scaling_factor or 1
+        self._offset = objective.offset
+        self._limit = limit
+        self._seen = seen
+        self.found = []  # (objective, assigned)
+
+    def on_solution_callback(self):
+        solution = np.asarray(self.Response().solution, dtype=np.int64)
+        assigned = assignments_from_solution(solution, self._index)
+        key = np.packbits(assigned).tobytes()
+        # Auxiliary variables (e.g. from symmetry breaking) can repeat a roster.
+        if key in self._seen:
+            return
+        self._seen.add(key)
+        inner = int(solution[self._objective_vars] @ self._objective_coeffs) + self._offset
+        self.found.append((self._scale * inner, assigned))
+        if len(self.found) >= self._limit:
+            self.StopSearch()
+
+
+def enumerate_alternatives(model: cp_model.CpModel, shifts: np.ndarray, result: dict, options: dict,
+                           alternatives: dict) -> list:
+    """Up to ``count`` distinct rosters within ``max_loss`` of ``result``, best first.
+
+    ``model`` must be the model ``result`` was solved from; it is left as it is.
+    The roster of ``result`` itself is always the first entry.
+    """
+    started = time.perf_counter()
+    objective = model.Proto().objective
+    scale = objective.scaling_factor or 1
+    best = result["objective"]
+    # Bound the objective's inner sum, whichever way it is optimized.
+    limit = best - alternatives["max_loss"] if scale < 0 else best + alternatives["max_loss"]
+    upper = math.floor(limit / scale - objective.offset + 1e-9)
+
+    first = np.zeros(shifts.shape, dtype=bool)
+    first[tuple(np.asarray(result["schedule"], dtype=np.int64).T)] = True
+    seen = {np.packbits(first).tobytes()}
+    rosters = [{"schedule": result["schedule"], "objective": best}]
+    if alternatives["count"] > 1:
+        collector = SolutionCollector(shifts, objective, alternatives["count"] - 1, seen)
+        enumeration = model.Clone()
+        enumeration.ClearObjective()
+        enumeration.ClearHints()
+        proto = enumeration.Proto()
+        linear = proto.constraints.add().linear
+        linear.vars.extend(objective.vars)
+        linear.coeffs.extend(objective.coeffs)
+        linear.domain.extend((cp_model.INT_MIN, upper))
+        proto.solution_hint.vars.extend(var_indices(shifts).ravel().tolist())
+        proto.solution_hint.values.extend(first.ravel().astype(int).tolist())
+
+        solver = make_solver(dict(options, time_limit=alternatives["time_limit"]))
+        # Enumeration is only supported by the single-worker search.
+        solver.parameters.num_workers = 1
+        solver.parameters.enumerate_all_solutions = True
+        solver.Solve(enumeration, collector)
+        collector.found.sort(key=lambda found: -found[0] if scale < 0 else found[0])
+        rosters.extend({"schedule": schedule_from_assignments(assigned), "objective": value}
+                       for value, assigned in collector.found)
+    result["alternatives"] = rosters
+    result.setdefault("timings", {})["alternatives"] = time.perf_counter() - started
+    return rosters
@@ -0,0 +1,66 @@
+"""Local simulated annealing of the scheduling QUBO across processes.
+
+``parallel_sample`` splits ``num_reads`` over a process pool, runs
+``SimulatedAnnealingSampler`` in each chunk with its own seed, and merges the
+chunks into one SampleSet. ``top_k`` then ranks the distinct samples by the
+number of violated hard constraints first and by energy second. So the
+sample that is returned respects the rules whenever any read found such a
+sample, even if an infeasible one has lower energy.
+"""
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Optional, Sequence
+
+import dimod
+import numpy as np
+from dwave.samplers import SimulatedAnnealingSampler
+
+from scheduling.problem import Problem
+from scheduling.qubo import sample_schedule
+from scheduling.validate import hard_violations
+
+
+def _sample_chunk(bqm, num_reads: int, seed: int, sampler_params: dict) -> dimod.SampleSet:
+    return SimulatedAnnealingSampler().sample(bqm, num_reads=num_reads, seed=seed, **sampler_params)
+
+
+def parallel_sample(bqm: dimod.BinaryQuadraticModel, num_reads: int = 100, num_workers: Optional[int] = None,
+                    num_sweeps: int = 1000, beta_range: Optional[Sequence[float]] = None,
+                    beta_schedule_type: str = "geometric", seed: Optional[int] = None,
+                    executor: Optional[Executor] = None) -> dimod.SampleSet:
+    """Anneal ``bqm`` ``num_reads`` times split over ``num_workers`` processes."""
+    num_workers = max(1, min(num_workers or os.cpu_count() or 1, num_reads))
+    sampler_params = {"num_sweeps": num_sweeps, "beta_range": beta_range, "beta_schedule_type": beta_schedule_type}
+    reads = [num_reads // num_workers + (1 if i < num_reads % num_workers else 0) for i in range(num_workers)]
+    # The sampler takes a signed 32-bit seed.
+    seeds = (np.random.SeedSequence(seed).generate_state(num_workers) >> 1).tolist()
+
+    if num_workers == 1:
+        return _sample_chunk(bqm, reads[0], seeds[0], sampler_params)
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=num_workers, mp_context=multiprocessing.get_context("spawn"))
+    try:
+        futures = [executor.submit(_sample_chunk, bqm, r, s, sampler_params) for r, s in zip(reads, seeds)]
+        return dimod.concatenate([future.result() for future in futures])
+    finally:
+        if own_executor:
+            executor.shutdown()
+
+
+def top_k(sampleset: dimod.SampleSet, problem: Problem, k: int = 1) -> list:
+    """The ``k`` best distinct samples, fewest hard violations first, then lowest energy."""
+    aggregated = sampleset.aggregate()
+    labels = np.fromiter(aggregated.variables, dtype=np.int64, count=len(aggregated.variables))
+    samples = aggregated.record.sample[:, np.argsort(labels)]
+    energies = aggregated.record.energy
+    violations = hard_violations(samples, problem)
+    ranked = np.lexsort((energies, violations))[:k]
+    return [{
+        "schedule": sample_schedule(samples[i], problem),
+        "energy": float(energies[i]),
+        "violations": int(violations[i]),
+        "feasible": bool(violations[i] == 0),
+        "num_occurrences": int(aggregated.record.num_occurrences[i]),
+    } for i in ranked]
@@ -0,0 +1,301 @@
+"""Interchangeable solver backends for the same ``/schedule`` payload.
+
+Clients may pass an optional ``"backend"``, either a name or an object:
+
+    "annealing"
+    {"name": "cpsat", "parameters": {"linearization_level": 2}}
+    {"name": "annealing", "num_reads": 128, "num_sweeps": 2000, "weights": {"a": 4.0}}
+    {"name": "lns", "days": 7, "nurses": 50, "sub_time_limit": 2}
+    {"name": "portfolio", "members": [{"name": "cpsat"}, {"name": "annealing"}]}
+
+* ``cpsat``: the CP-SAT model, with optional extra ``SatParameters`` fields.
+* ``annealing``: the QUBO from scheduling.qubo, sampled locally in rounds
+  until ``num_reads`` or the time limit is used up. This needs the D-Wave
+  packages.
+* ``lns``: large-neighborhood search from scheduling.lns, for rosters too
+  large for one CP-SAT model. With several workers, independent
+  neighborhoods are solved in parallel processes.
+* ``portfolio``: every member runs in its own process with the same
+  deadline. Once a member proves optimality, or the deadline passes, the
+  other members are terminated. The best schedule that passes the hard-rule
+  check wins, and ``winner`` records which member it came from.
+
+Every backend returns the same result dict as ``solve()``, plus ``backend``.
+"""
+import multiprocessing
+import queue
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import numpy as np
+from google.protobuf import json_format, text_format
+from ortools.sat import sat_parameters_pb2
+
+from scheduling.problem import Problem
+from scheduling.solve import build_problem_model, make_solver, run_solver
+from scheduling.templates import default_cache
+from scheduling.validate import schedule_violations
+
+CPSAT = "cpsat"
+ANNEALING = "annealing"
+LNS = "lns"
+PORTFOLIO = "portfolio"
+MAX_MEMBERS = 8
+# Time allowed past the deadline for members to extract and send their result.
+PORTFOLIO_GRACE = 2.0
+
+DEFAULT_MEMBERS = [
+    {"name": CPSAT, "parameters": {}},
+    {"name": CPSAT, "parameters": {"linearization_level": 2}},
+    {"name": ANNEALING, "num_reads": 64, "num_sweeps": 1000, "weights": {}},
+]
+
+
+# Parameters that set the resources or the output of a solve. The request's
+# "solver" options govern those, so clients can't override them here.
+RESERVED_PARAMETERS = frozenset({
+    "max_time_in_seconds", "num_workers", "num_search_workers", "shared_tree_num_workers", "subsolver_params",
+    "max_memory_in_mb", "enumerate_all_solutions", "solution_pool_size", "keep_all_feasible_solutions_in_presolve",
+    "fill_additional_solutions_in_response", "fill_tightened_domains_in_response",
+})
+
+
+def _cpsat_parameters(raw) -> dict:
+    raw = raw or {}
+    if not isinstance(raw, dict):
+        raise ValueError("'backend.parameters' must be an object of CP-SAT parameters")
+    parameters = sat_parameters_pb2.SatParameters()
+    try:
+        json_format.ParseDict(raw, parameters)
+    except json_format.ParseError as e:
+        raise ValueError(f"invalid CP-SAT parameters: {str(e).splitlines()[0]}") from None
+    # Listed by field name, so camelCase JSON keys are caught too.
+    reserved = sorted(field.name for field, _ in parameters.ListFields()
+                      if field.name in RESERVED_PARAMETERS or field.name.startswith(("log_", "debug_")))
+    if reserved:
+        raise ValueError(f"CP-SAT parameters can't set {', '.join(reserved)}; the time limit and workers "
+                         "come from 'solver'")
+    return raw
+
+
+def _merge_parameters(parameters, raw: dict) -> None:
+    """Merge JSON ``SatParameters`` fields into ``solver.parameters``.
+
+    Newer OR-Tools releases wrap the parameters in a C++ class that only
+    takes text format, not protobuf messages.
+    """
+    text = text_format.MessageToString(json_format.ParseDict(raw, sat_parameters_pb2.SatParameters()))
+    if hasattr(parameters, "merge_text_format"):
+        parameters.merge_text_format(text)
+    else:
+        text_format.Merge(text, parameters)
+
+
+def _annealing_options(raw: dict) -> dict:
+    from scheduling.qubo import QuboWeights
+
+    num_reads = raw.get("num_reads", 64)
+    num_sweeps = raw.get("num_sweeps", 1000)
+    weights = raw.get("weights") or {}
+    for key, value in (("num_reads", num_reads), ("num_sweeps", num_sweeps)):
+        if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+            raise ValueError(f"'backend.{key}' must be a positive integer")
+    if not isinstance(weights, dict) or set(weights) - set(QuboWeights._fields):
+        raise ValueError(f"'backend.weights' may only set {', '.join(QuboWeights._fields)}")
+    return {"num_reads": num_reads, "num_sweeps": num_sweeps, "weights": weights}
+
+
+def _lns_options(raw: dict) -> dict:
+    options = {"days": raw.get("days", 7), "nurses": raw.get("nurses", 50),
+               "max_iterations": raw.get("max_iterations", 100000), "seed": raw.get("seed", 0)}
+    for key, value in options.items():
+        if isinstance(value, bool) or not isinstance(value, int) or value < (0 if key == "seed" else 1):
+            raise ValueError(f"'backend.{key}' must be a {'non-negative' if key == 'seed' else 'positive'} integer")
+    sub_time_limit = raw.get("sub_time_limit", 2.0)
+    if isinstance(sub_time_limit, bool) or not isinstance(sub_time_limit, (int, float)) or sub_time_limit <= 0:
+        raise ValueError("'backend.sub_time_limit' must be a positive number of seconds")
+    options["sub_time_limit"] = float(sub_time_limit)
+    return options
+
+
+def _parse_backend(raw, allow_portfolio: bool = True) -> dict:
+    if isinstance(raw, str):
+        raw = {"name": raw}
+    if not isinstance(raw, dict):
+        raise ValueError("'backend' must be a backend name or an object")
+    name = raw.get("name")
+    if name == CPSAT:
+        return {"name": CPSAT, "parameters": _cpsat_parameters(raw.get("parameters"))}
+    if name == ANNEALING:
+        return {"name": ANNEALING, **_annealing_options(raw)}
+    if name == LNS:
+        return {"name": LNS, **_lns_options(raw)}
+    if name == PORTFOLIO and allow_portfolio:
+        members = raw.get("members", DEFAULT_MEMBERS)
+        if not isinstance(members, list) or not 1 <= len(members) <= MAX_MEMBERS:
+            raise ValueError(f"'backend.members' must list 1 to {MAX_MEMBERS} backends")
+        return {"name": PORTFOLIO, "members": [_parse_backend(member, allow_portfolio=False) for member in members]}
+    names = [CPSAT, ANNEALING, LNS] + ([PORTFOLIO] if allow_portfolio else [])
+    raise ValueError(f"'backend' must be one of {', '.join(names)}")
+
+
+def backend_options(data: dict) -> Optional[dict]:
+    """Validate the optional ``"backend"`` payload entry; None means plain CP-SAT."""
+    raw = data.get("backend")
+    return None if raw is None else _parse_backend(raw)
+
+
+def applies_symmetry_breaking(backend: dict) -> bool:
+    """Whether every backend that runs honors ``solver.symmetry_breaking``: only CP-SAT does."""
+    members = backend["members"] if backend["name"] == PORTFOLIO else [backend]
+    return all(member["name"] == CPSAT for member in members)
+
+
+def solve_cpsat(problem: Problem, options: dict, backend: dict, template_cache=default_cache) -> dict:
+    model, shifts = build_problem_model(problem, template_cache, options.get("symmetry_breaking", False))
+    solver = make_solver(options)
+    _merge_parameters(solver.parameters, backend["parameters"])
+    solver.parameters.max_time_in_seconds = options["time_limit"]
+    solver.parameters.num_workers = options["num_search_workers"]
+    return dict(run_solver(solver, model, shifts), backend=CPSAT)
+
+
+def solve_annealing(problem: Problem, options: dict, backend: dict) -> dict:
+    from scheduling.annealing import parallel_sample, top_k
+    from scheduling.calibration import tuned_weights
+    from scheduling.qubo import build_qubo
+
+    started = time.perf_counter()
+    time_limit = options["time_limit"]
+    # Weights given in the payload override the ones calibrated for this shape.
+    bqm = build_qubo(problem, tuned_weights(problem)._replace(**backend["weights"]))
+    num_workers = min(options["num_search_workers"], backend["num_reads"])
+    # Reads are taken in rounds so the time limit is checked between them.
+    round_reads = max(num_workers, min(backend["num_reads"], 8 * num_workers))
+    executor = None
+    if num_workers > 1:
+        executor = ProcessPoolExecutor(max_workers=num_workers, mp_context=multiprocessing.get_context("spawn"))
+    best, reads = None, 0
+    try:
+        while reads < backend["num_reads"] and (best is None or time.perf_counter() - started < time_limit):
+            chunk = min(round_reads, backend["num_reads"] - reads)
+            sampleset = parallel_sample(bqm, num_reads=chunk, num_workers=num_workers,
+                                        num_sweeps=backend["num_sweeps"], seed=reads, executor=executor)
+            reads += chunk
+            candidate = top_k(sampleset, problem)[0]
+            if best is None or (candidate["violations"], candidate["energy"]) < (best["violations"], best["energy"]):
+                best = candidate
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    feasible = best["feasible"]
+    objective = None
+    if feasible:
+        objective = float(problem.shift_requests[tuple(np.asarray(best["schedule"]).T)].sum())
+    return {
+        "solver_status": "FEASIBLE" if feasible else "UNKNOWN",
+        "schedule": best["schedule"] if feasible else None,
+        "objective": objective,
+        "bound": None,
+        "gap": None,
+        "wall_time": time.perf_counter() - started,
+        "backend": ANNEALING,
+        "energy": best["energy"],
+        "violations": best["violations"],
+        "num_reads": reads,
+    }
+
+
+def solve_large_neighborhood(problem: Problem, options: dict, backend: dict) -> dict:
+    from scheduling.lns import solve_lns
+
+    executor = None
+    if options["num_search_workers"] > 1:
+        executor = ProcessPoolExecutor(max_workers=options["num_search_workers"],
+                                       mp_context=multiprocessing.get_context("spawn"))
+    try:
+        return dict(solve_lns(problem, options, backend, executor), backend=LNS)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+def _run_member(results, index: int, backend: dict, problem: Problem, options: dict, deadline: float) -> None:
+    # The deadline is wall-clock time, so process start-up counts against it.
+    options = dict(options, time_limit=max(0.1, deadline - time.time()))
+    try:
+        result = BACKENDS[backend["name"]](problem, options, backend)
+    except Exception as e:  # report a broken member instead of letting it hang the race
+        result = {"error": f"{type(e).__name__}: {e}"}
+    results.put((index, result))
+
+
+def _member_summary(backend: dict, result: Optional[dict]) -> dict:
+    summary = {"backend": backend}
+    if result is None:
+        summary["solver_status"] = "STOPPED"
+    elif "error" in result:
+        summary["error"] = result["error"]
+    else:
+        summary.update((key, result.get(key)) for key in ("solver_status", "objective", "wall_time", "violations"))
+    return summary
+
+
+def solve_portfolio(problem: Problem, options: dict, backend: dict) -> dict:
+    started = time.perf_counter()
+    members = backend["members"]
+    cpsat_workers = max(1, options["num_search_workers"] // len(members))
+    deadline = time.time() + options["time_limit"]
+
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    processes = []
+    for i, member in enumerate(members):
+        # Members are daemon processes, which can't start pools of their own.
+        workers = cpsat_workers if member["name"] == CPSAT else 1
+        args = (results, i, member, problem, dict(options, num_search_workers=workers), deadline)
+        processes.append(context.Process(target=_run_member, args=args, daemon=True))
+    for process in processes:
+        process.start()
+    finished = {}
+    try:
+        while len(finished) < len(processes):
+            try:
+                index, result = results.get(timeout=max(0.0, deadline + PORTFOLIO_GRACE - time.time()))
+            except queue.Empty:
+                break
+            finished[index] = result
+            if result.get("solver_status") in ("OPTIMAL", "INFEASIBLE"):
+                break  # proven: no other member can do better
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+
+    candidates = [(result["objective"], result["solver_status"] == "OPTIMAL", -index)
+                  for index, result in finished.items()
+                  if result.get("schedule") is not None and schedule_violations(result["schedule"], problem) == 0]
+    summaries = [_member_summary(member, finished.get(i)) for i, member in enumerate(members)]
+    if candidates:
+        winner = -max(candidates)[2]
+        result = dict(finished[winner])
+    else:
+        winner = None
+        statuses = {result.get("solver_status") for result in finished.values()}
+        result = {"solver_status": "INFEASIBLE" if "INFEASIBLE" in statuses else "UNKNOWN", "schedule": None,
+                  "objective": None, "bound": None, "gap": None}
+    result.update(wall_time=time.perf_counter() - started, backend=PORTFOLIO, members=summaries,
+                  winner=None if winner is None else dict(summaries[winner], index=winner))
+    return result
+
+
+BACKENDS = {CPSAT: solve_cpsat, ANNEALING: solve_annealing, LNS: solve_large_neighborhood,
+            PORTFOLIO: solve_portfolio}
+
+
+def solve_backend(problem: Problem, options: dict, backend: dict) -> dict:
+    """Solve ``problem`` with the backend configured by backend_options()."""
+    return BACKENDS[backend["name"]](problem, options, backend)
@@ -0,0 +1,99 @@
+"""Solve many scheduling problems in parallel and yield results as they finish.
+
+Used by ``/schedule/batch`` for what-if sweeps. Each problem is solved by one
+process of a shared pool with a single CP-SAT worker unless the problem asks
+for more, so a batch spreads across cores instead of oversubscribing them.
+"""
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Iterator, Optional
+
+from scheduling.feasibility import check_feasible
+from scheduling.problem import parse_problem
+from scheduling.solve import solve_problem, solver_options
+
+MAX_BATCH_SIZE = 1000
+
+
+def parse_batch_item(data) -> tuple:
+    """Return ``(problem, options)`` for one batch entry.
+
+    Raises ValueError if it is malformed or screening proves it infeasible.
+    """
+    problem = parse_problem(data)
+    options = solver_options(data)
+    check_feasible(problem)
+    if "num_search_workers" not in (data.get("solver") or {}):
+        options["num_search_workers"] = 1
+    return problem, options
+
+
+class BatchSolver:
+    """Process pool shared by all batches, started on first use."""
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                context = multiprocessing.get_context("spawn")
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+            return self._executor
+
+    def solve(self, items: list) -> Iterator[dict]:
+        """Yield ``{"index": i, "result": ..., "problem": ...}`` or ``{"index": i, "error": ...}``
+        per item in completion order, then a ``{"summary": ...}`` record with the batch throughput.
+
+        ``problem`` is the parsed Problem the result belongs to.
+        """
+        start = time.perf_counter()
+        pending, problems = {}, {}
+        solved = failed = 0
+        for index, data in enumerate(items):
+            try:
+                problem, options = parse_batch_item(data)
+            except ValueError as e:
+                failed += 1
+                yield {"index": index, "error": str(e)}
+                continue
+            pending[self.pool().submit(solve_problem, problem, options)] = index
+            problems[index] = problem
+
+        try:
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = pending.pop(future)
+                    problem = problems.pop(index)
+                    error = future.exception()
+                    if error is not None:
+                        failed += 1
+                        yield {"index": index, "error": str(error)}
+                    else:
+                        solved += 1
+                        yield {"index": index, "result": future.result(), "problem": problem}
+        finally:
+            # The client went away: don't solve what nobody will read.
+            for future in pending:
+                future.cancel()
+
+        elapsed = time.perf_counter() - start
+        yield {"summary": {
+            "instances": len(items),
+            "solved": solved,
+            "failed": failed,
+            "elapsed": elapsed,
+            "instances_per_second": solved / elapsed if elapsed > 0 else None,
+        }}
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
@@ -0,0 +1,164 @@
+"""Content-addressed cache of solved schedules.
+
+Results are keyed by a hash of the normalized problem (sizes, shift requests,
+holidays) and the solver options, so byte-identical or merely re-serialized
+payloads share one entry. There is an in-memory LRU tier and an optional
+SQLite tier that survives restarts and is shared by processes on the host.
+Both tiers expire entries after ``ttl`` seconds and evict the least recently
+used ones beyond their size bound.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+from scheduling.problem import Problem
+
+# Bump when a model change makes previously cached answers wrong.
+KEY_VERSION = 1
+
+CACHEABLE_STATUSES = ("OPTIMAL", "FEASIBLE", "INFEASIBLE")
+
+
+def problem_key(problem: Problem, options: dict) -> str:
+    header = json.dumps({
+        "version": KEY_VERSION,
+        "shape": [problem.num_nurses, problem.num_shifts, problem.num_days],
+        "options": options,
+    }, sort_keys=True)
+    digest = hashlib.sha256(header.encode())
+    digest.update(np.ascontiguousarray(problem.shift_requests, dtype=np.int64).tobytes())
+    digest.update(np.ascontiguousarray(problem.holiday_requests == 1, dtype=np.uint8).tobytes())
+    return digest.hexdigest()
+
+
+class _DiskTier:
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._connection = None
+        self._inherited = None
+        self._pid = None
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS solutions ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL,"
+            "created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS solutions_accessed ON solutions (accessed)")
+
+    @property
+    def _db(self) -> sqlite3.Connection:
+        # A SQLite connection must not be used across fork(), so every
+        # preforked worker opens its own. The inherited one is kept, not
+        # closed, since closing it would act on the parent's file locks.
+        if self._pid != os.getpid():
+            self._inherited = self._connection
+            self._connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._pid = os.getpid()
+        return self._connection
+
+    def get(self, key: str, ttl: float) -> Optional[str]:
+        now = time.time()
+        row = self._db.execute("SELECT value, created FROM solutions WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        if now - row[1] > ttl:
+            self._db.execute("DELETE FROM solutions WHERE key = ?", (key,))
+            return None
+        self._db.execute("UPDATE solutions SET accessed = ? WHERE key = ?", (now, key))
+        return row[0]
+
+    def put(self, key: str, value: str, ttl: float) -> None:
+        now = time.time()
+        self._db.execute(
+            "INSERT OR REPLACE INTO solutions (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+            (key, value, len(value), now, now),
+        )
+        self._db.execute("DELETE FROM solutions WHERE created < ?", (now - ttl,))
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM solutions").fetchone()[0]
+        if total > self.max_bytes:
+            # Drop the least recently used rows until the tier fits again.
+            self._db.execute(
+                "DELETE FROM solutions WHERE key IN ("
+                " SELECT key FROM (SELECT key, SUM(size) OVER (ORDER BY accessed DESC) AS running FROM solutions)"
+                " WHERE running > ?)",
+                (self.max_bytes,),
+            )
+
+    def stats(self) -> dict:
+        entries, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM solutions").fetchone()
+        return {"entries": entries, "bytes": size}
+
+
+class SolutionCache:
+    """Two-tier (memory, optional SQLite) TTL cache of solve results."""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 3600.0, path: Optional[str] = None,
+                 max_disk_bytes: int = 256 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._memory = OrderedDict()  # key -> (created, result)
+        self._disk = _DiskTier(path, max_disk_bytes) if path else None
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._hit_seconds = 0.0
+
+    def get(self, key: str) -> Optional[dict]:
+        start = time.perf_counter()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and time.time() - entry[0] <= self.ttl:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                self._hit_seconds += time.perf_counter() - start
+                return entry[1]
+            if entry is not None:
+                del self._memory[key]
+            value = self._disk.get(key, self.ttl) if self._disk is not None else None
+            if value is None:
+                self.misses += 1
+                return None
+            result = json.loads(value)
+            self._remember(key, result)
+            self.disk_hits += 1
+            self._hit_seconds += time.perf_counter() - start
+            return result
+
+    def put(self, key: str, result: dict) -> None:
+        if result["solver_status"] not in CACHEABLE_STATUSES:
+            return
+        with self._lock:
+            self._remember(key, result)
+            if self._disk is not None:
+                self._disk.put(key, json.dumps(result), self.ttl)
+
+    def _remember(self, key, result):
+        self._memory[key] = (time.time(), result)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            stats = {
+                "entries": len(self._memory),
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_ratio": hits / lookups if lookups else None,
+                "mean_hit_seconds": self._hit_seconds / hits if hits else None,
+            }
+            if self._disk is not None:
+                stats["disk"] = self._disk.stats()
+            return stats
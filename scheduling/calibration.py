@@ -0,0 +1,172 @@
+"""Calibrate the QUBO penalty weights per problem shape and keep them for runtime use.
+
+The default ``QuboWeights`` were tuned by hand for one small instance. On
+other shapes they give samples that break hard rules, and annealing reads
+are wasted. ``calibrate`` searches the penalty weights on generated
+instances of one shape: every candidate anneals every instance in a process
+pool. Candidates are ranked by feasible samples per second of annealing,
+which weighs the feasibility rate against the time each read takes. Ties go
+to more fulfilled requests among the feasible samples, then to fewer
+violations per read, which steers the search while nothing is feasible yet.
+Energies of different weights aren't comparable, so they are only reported.
+Each round after the first searches closer around the best candidate so far.
+
+The result is stored per ``NURSESxSHIFTSxDAYS`` profile in a JSON file by
+``python -m benchmarks.calibration``. Set ``QUBO_WEIGHTS_PATH`` to that file
+and ``tuned_weights`` hands the weights to the annealing backend for problems
+of a calibrated shape.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Executor
+from typing import Optional, Sequence
+
+import numpy as np
+from dwave.samplers import SimulatedAnnealingSampler
+
+from scheduling.problem import Problem
+from scheduling.qubo import QuboWeights, build_qubo
+from scheduling.validate import hard_violations
+
+# The penalty weights searched; the rest keep the base values.
+PENALTIES = ("a", "lagrange_hard_shift", "lagrange_soft_nurse", "penalty_off_day")
+STORE_VERSION = 1
+
+logger = logging.getLogger(__name__)
+
+
+def shape_key(num_nurses: int, num_shifts: int, num_days: int) -> str:
+    return f"{num_nurses}x{num_shifts}x{num_days}"
+
+
+class WeightStore:
+    """Tuned weights per shape in a JSON file, re-read when the file changes."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._profiles = {}
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    def profiles(self) -> dict:
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        with self._lock:
+            mtime = os.path.getmtime(self.path)
+            if mtime != self._mtime:
+                with open(self.path) as f:
+                    data = json.load(f)
+                if data.get("version") != STORE_VERSION:
+                    raise ValueError(f"{self.path}: unsupported weight store version {data.get('version')}")
+                self._profiles, self._mtime = data["profiles"], mtime
+            return self._profiles
+
+    def get(self, num_nurses: int, num_shifts: int, num_days: int) -> Optional[QuboWeights]:
+        profile = self.profiles().get(shape_key(num_nurses, num_shifts, num_days))
+        return None if profile is None else QuboWeights(**profile["weights"])
+
+    def put(self, num_nurses: int, num_shifts: int, num_days: int, weights: QuboWeights, stats: dict) -> None:
+        """Store ``weights`` for the shape, replacing the file atomically."""
+        profiles = dict(self.profiles())
+        profiles[shape_key(num_nurses, num_shifts, num_days)] = dict(stats, weights=weights._asdict())
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"version": STORE_VERSION, "profiles": profiles}, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.path)
+
+
+default_store = WeightStore(os.environ.get("QUBO_WEIGHTS_PATH"))
+
+
+def tuned_weights(problem: Problem, default: QuboWeights = QuboWeights(),
+                  store: WeightStore = default_store) -> QuboWeights:
+    """The calibrated weights for the problem's shape, or ``default`` if it has none.
+
+    An unreadable store is logged and treated as empty, so it can't fail a solve.
+    """
+    try:
+        weights = store.get(problem.num_nurses, problem.num_shifts, problem.num_days)
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.warning("ignoring the QUBO weight store: %s", e)
+        return default
+    return default if weights is None else weights
+
+
+def evaluate(problem: Problem, weights: QuboWeights, num_reads: int, num_sweeps: int, seed: int) -> dict:
+    """Anneal one instance with ``weights`` and measure how useful the reads were."""
+    bqm = build_qubo(problem, weights)
+    started = time.perf_counter()
+    sampleset = SimulatedAnnealingSampler().sample(bqm, num_reads=num_reads, num_sweeps=num_sweeps, seed=seed)
+    seconds = time.perf_counter() - started
+    labels = np.fromiter(sampleset.variables, dtype=np.int64, count=len(sampleset.variables))
+    samples = sampleset.record.sample[:, np.argsort(labels)]
+    violations = hard_violations(samples, problem)
+    feasible = violations == 0
+    fulfilled = (samples[feasible] * problem.shift_requests.reshape(1, -1)).sum(axis=1)
+    return {
+        "seconds": seconds,
+        "feasible": int(feasible.sum()),
+        "reads": num_reads,
+        "violations": int(violations.sum()),
+        "fulfilled": float(fulfilled.mean()) if feasible.any() else None,
+        "best_energy": float(sampleset.record.energy.min()),
+    }
+
+
+def _summary(weights: QuboWeights, runs: list) -> dict:
+    feasible = sum(run["feasible"] for run in runs)
+    reads = sum(run["reads"] for run in runs)
+    seconds = sum(run["seconds"] for run in runs)
+    fulfilled = [run["fulfilled"] for run in runs if run["fulfilled"] is not None]
+    return {
+        "weights": weights,
+        "feasibility_rate": feasible / reads,
+        "feasible_per_second": feasible / seconds if seconds > 0 else 0.0,
+        "seconds_per_read": seconds / reads,
+        "mean_fulfilled": float(np.mean(fulfilled)) if fulfilled else None,
+        "mean_violations": sum(run["violations"] for run in runs) / reads,
+        "best_energy": min(run["best_energy"] for run in runs),
+    }
+
+
+def _rank(summary: dict) -> tuple:
+    return summary["feasible_per_second"], summary["mean_fulfilled"] or 0.0, -summary["mean_violations"]
+
+
+def candidates(rng: np.random.Generator, center: QuboWeights, count: int, spread: float) -> list:
+    """``center`` plus ``count - 1`` log-uniform scalings of its penalties within ``spread``x."""
+    found = [center]
+    for factors in np.exp(rng.uniform(-np.log(spread), np.log(spread), size=(count - 1, len(PENALTIES)))):
+        found.append(center._replace(**{name: round(getattr(center, name) * float(factor), 4)
+                                        for name, factor in zip(PENALTIES, factors)}))
+    return found
+
+
+def calibrate(problems: Sequence[Problem], base: QuboWeights = QuboWeights(), num_candidates: int = 16,
+              rounds: int = 2, num_reads: int = 32, num_sweeps: int = 1000, seed: int = 0,
+              executor: Optional[Executor] = None) -> list:
+    """Candidate summaries ranked best first, over every round.
+
+    Round ``r`` scales the best weights so far by up to ``4 / 2**r`` either way.
+    """
+    rng = np.random.default_rng(seed)
+    results = []
+    center = base
+    for round_index in range(rounds):
+        spread = max(4.0 / 2 ** round_index, 1.1)
+        weights = candidates(rng, center, num_candidates, spread)
+        tasks = [(weights_index, (problem, w, num_reads, num_sweeps, seed + i))
+                 for weights_index, w in enumerate(weights) for i, problem in enumerate(problems)]
+        if executor is None:
+            runs = [(index, evaluate(*args)) for index, args in tasks]
+        else:
+            futures = [(index, executor.submit(evaluate, *args)) for index, args in tasks]
+            runs = [(index, future.result()) for index, future in futures]
+        for weights_index, w in enumerate(weights):
+            results.append(_summary(w, [run for index, run in runs if index == weights_index]))
+        results.sort(key=_rank, reverse=True)
+        center = results[0]["weights"]
+    return results
@@ -0,0 +1,155 @@
+"""Reject infeasible problems before solving, and explain the ones that slip through.
+
+``screen`` runs counting arguments over the whole problem with NumPy, in
+microseconds even for large rosters:
+
+* every day has at least ``num_shifts`` nurses without a holiday;
+* every nurse can work the minimum of the even-distribution bounds on the
+  days left to them (with one shift a day, never two days in a row);
+* the nurses can cover every shift without going over the maximum;
+* with one shift a day, two consecutive days aren't both left to the same
+  single nurse.
+
+They are necessary conditions only. ``diagnose`` handles the rest: every
+holiday and every nurse's fairness bounds get an assumption literal, and the
+core CP-SAT reports for the infeasible model is shrunk by deletion until it is
+a minimal conflicting set, or the time budget runs out.
+"""
+import time
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+from scheduling.model import add_structural_constraints, fairness_bounds, new_shift_vars
+from scheduling.problem import Problem
+from scheduling.solve import make_solver
+
+
+class InfeasibleError(ValueError):
+    """Raised by check_feasible() when screening proves a problem infeasible."""
+
+    def __init__(self, issues: list):
+        super().__init__("infeasible: " + "; ".join(issue["message"] for issue in issues[:3]))
+        self.issues = issues
+
+
+def _capacity(available: np.ndarray, num_shifts: int) -> np.ndarray:
+    """Most shifts each nurse can work on the days available to them."""
+    if num_shifts > 1:
+        # Taking the first shift every day never breaks the rest rule.
+        return available.sum(axis=1)
+    # One shift a day: at most every other day of each run of available days.
+    padded = np.pad(available.astype(np.int8), ((0, 0), (1, 1)))
+    rows, starts = np.nonzero(np.diff(padded, axis=1) == 1)
+    _, ends = np.nonzero(np.diff(padded, axis=1) == -1)
+    return np.bincount(rows, weights=(ends - starts + 1) // 2, minlength=len(available)).astype(np.int64)
+
+
+def screen(problem: Problem) -> list:
+    """Issues that make ``problem`` infeasible; an empty list proves nothing."""
+    available = problem.holiday_requests != 1
+    issues = []
+
+    per_day = available.sum(axis=0)
+    for day in np.flatnonzero(per_day < problem.num_shifts).tolist():
+        issues.append({"constraint": "coverage", "day": day, "available": int(per_day[day]),
+                       "required": problem.num_shifts,
+                       "message": f"day {day} has {per_day[day]} available nurses for {problem.num_shifts} shifts"})
+
+    min_shifts, max_shifts = fairness_bounds(problem.num_nurses, problem.num_shifts, problem.num_days)
+    capacity = _capacity(available, problem.num_shifts)
+    for nurse in np.flatnonzero(capacity < min_shifts).tolist():
+        issues.append({"constraint": "fairness", "nurse": nurse, "capacity": int(capacity[nurse]),
+                       "min": min_shifts,
+                       "message": f"nurse {nurse} can work {capacity[nurse]} shifts but must work {min_shifts}"})
+
+    total = int(np.minimum(capacity, max_shifts).sum())
+    required = problem.num_days * problem.num_shifts
+    if total < required:
+        issues.append({"constraint": "capacity", "capacity": total, "required": required,
+                       "message": f"the nurses can cover {total} of {required} shifts within {max_shifts} each"})
+
+    if problem.num_shifts == 1:
+        alone = per_day == 1
+        same = (available[:, :-1] & available[:, 1:]).any(axis=0) & alone[:-1] & alone[1:]
+        for day in np.flatnonzero(same).tolist():
+            nurse = int(np.flatnonzero(available[:, day])[0])
+            issues.append({"constraint": "rest", "day": day, "nurse": nurse,
+                           "message": f"only nurse {nurse} can work days {day} and {day + 1}"})
+    return issues
+
+
+def check_feasible(problem: Problem) -> None:
+    """Raise InfeasibleError if screen() finds any issue."""
+    issues = screen(problem)
+    if issues:
+        raise InfeasibleError(issues)
+
+
+def _conflict_entry(kind: str, nurse: int, day: int, bounds) -> dict:
+    if kind == "holiday":
+        return {"constraint": "holiday", "nurse": nurse, "day": day}
+    return {"constraint": "fairness", "nurse": nurse, "min": bounds[0], "max": bounds[1]}
+
+
+def diagnose(problem: Problem, options: dict) -> dict:
+    """A minimal set of holiday and fairness constraints that can't all hold.
+
+    Coverage, one shift per day and the rest rule stay hard. Returns
+    ``{"feasible": ...}`` and, when infeasible, ``conflict`` and whether it
+    was proven ``minimal`` within ``options["time_limit"]``.
+    """
+    started = time.perf_counter()
+    model = cp_model.CpModel()
+    shifts = new_shift_vars(model, problem.num_nurses, problem.num_shifts, problem.num_days)
+    add_structural_constraints(model, shifts, 0, problem.num_days * problem.num_shifts)
+
+    bounds = fairness_bounds(problem.num_nurses, problem.num_shifts, problem.num_days)
+    guards = {}  # assumption literal index -> (kind, nurse, day)
+    literals = {}  # assumption literal index -> literal
+    for nurse in range(problem.num_nurses):
+        literal = model.NewBoolVar(f"fairness_n{nurse}")
+        model.AddLinearConstraint(cp_model.LinearExpr.Sum(shifts[nurse].ravel().tolist()),
+                                  *bounds).OnlyEnforceIf(literal)
+        guards[literal.Index()] = ("fairness", nurse, None)
+        literals[literal.Index()] = literal
+    for nurse, day in np.argwhere(problem.holiday_requests == 1).tolist():
+        literal = model.NewBoolVar(f"holiday_n{nurse}_d{day}")
+        model.Add(cp_model.LinearExpr.Sum(shifts[nurse, day].tolist()) == 0).OnlyEnforceIf(literal)
+        guards[literal.Index()] = ("holiday", nurse, day)
+        literals[literal.Index()] = literal
+
+    def solve_with(assumptions):
+        remaining = options["time_limit"] - (time.perf_counter() - started)
+        solver = make_solver(dict(options, time_limit=max(0.1, remaining)))
+        # Cores are collected by the sequential search.
+        solver.parameters.num_workers = 1
+        model.ClearAssumptions()
+        model.AddAssumptions([literals[index] for index in assumptions])
+        return solver, solver.Solve(model)
+
+    solver, status = solve_with(list(guards))
+    if status != cp_model.INFEASIBLE:
+        return {"feasible": True if status in (cp_model.OPTIMAL, cp_model.FEASIBLE) else None}
+
+    # Deletion: drop every literal the rest of the core is still infeasible without.
+    core = list(solver.SufficientAssumptionsForInfeasibility())
+    minimal = True
+    for literal in list(core):
+        if literal not in core:
+            continue
+        if time.perf_counter() - started >= options["time_limit"]:
+            minimal = False
+            break
+        rest = [other for other in core if other != literal]
+        solver, status = solve_with(rest)
+        if status == cp_model.INFEASIBLE:
+            reported = set(solver.SufficientAssumptionsForInfeasibility())
+            core = [other for other in rest if other in reported] or rest
+        elif status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            minimal = False
+    return {
+        "feasible": False,
+        "conflict": [_conflict_entry(*guards[literal], bounds) for literal in sorted(core)],
+        "minimal": minimal,
+    }
@@ -0,0 +1,243 @@
+"""Rolling-horizon decomposition for long planning periods.
+
+The monolithic model grows with nurses x days x shifts. For quarter- or
+year-long rosters the horizon is instead solved in windows of ``window`` days:
+
+* ``sequential``: overlapping windows solved one after another. Only the days
+  before the overlap are committed, and the next window starts from them. The
+  rest rule is carried across the edge: whoever worked the last shift of the
+  last committed day can't take the first shift of the window. Running shift
+  counts are carried too. Each window's count bounds keep every nurse able to
+  reach the full-horizon fairness bounds, and stay within ``pace_slack`` of
+  the even share.
+* ``parallel``: non-overlapping blocks made independent up front. A small
+  quota model splits every nurse's total over the blocks. At each block edge
+  the even-numbered nurses may take the last shift and only the others the
+  first shift. The blocks are then solved concurrently. If a block turns out
+  infeasible, the horizon is re-solved sequentially.
+
+Both give a feasible full-horizon roster, not a proven optimum.
+"""
+import math
+import time
+from concurrent.futures import Executor
+from typing import Optional
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+from scheduling.model import add_holidays, add_structural_constraints, fairness_bounds, new_shift_vars, set_objective
+from scheduling.problem import Problem
+from scheduling.solve import solve
+
+SEQUENTIAL = "sequential"
+PARALLEL = "parallel"
+
+
+def horizon_options(data: dict) -> Optional[dict]:
+    """Validate the optional ``"horizon"`` payload entry; None means a monolithic solve."""
+    raw = data.get("horizon")
+    if raw is None:
+        return None
+    if not isinstance(raw, dict):
+        raise ValueError("'horizon' must be an object")
+    window = raw.get("window", 14)
+    if isinstance(window, bool) or not isinstance(window, int) or window < 2:
+        raise ValueError("'horizon.window' must be an integer of at least 2 days")
+    overlap = raw.get("overlap", window // 2)
+    mode = raw.get("mode", SEQUENTIAL)
+    pace_slack = raw.get("pace_slack", 1)
+    if isinstance(overlap, bool) or not isinstance(overlap, int) or not 0 <= overlap < window:
+        raise ValueError("'horizon.overlap' must be an integer in [0, window)")
+    if mode not in (SEQUENTIAL, PARALLEL):
+        raise ValueError(f"'horizon.mode' must be '{SEQUENTIAL}' or '{PARALLEL}'")
+    if pace_slack is not None and (isinstance(pace_slack, bool) or not isinstance(pace_slack, int) or pace_slack < 0):
+        raise ValueError("'horizon.pace_slack' must be a non-negative integer or null")
+    return {"window": window, "overlap": overlap, "mode": mode, "pace_slack": pace_slack}
+
+
+def _remaining_capacity(num_shifts: int, days: int) -> int:
+    # With a single shift the rest rule forbids working two days in a row.
+    return days if num_shifts > 1 else (days + 1) // 2
+
+
+def _solve_window(shift_requests, holiday_requests, min_shifts, max_shifts, no_first, no_last, options) -> dict:
+    """Solve days ``[0, len)`` of a sub-problem with per-nurse count bounds.
+
+    ``no_first``/``no_last`` list the nurses barred from the first shift of
+    the first day and the last shift of the last day.
+    """
+    num_nurses, num_days, num_shifts = shift_requests.shape
+    model = cp_model.CpModel()
+    shifts = new_shift_vars(model, num_nurses, num_shifts, num_days)
+    add_structural_constraints(model, shifts, min_shifts, max_shifts)
+    add_holidays(model, shifts, holiday_requests)
+    set_objective(model, shifts, shift_requests)
+    barred = shifts[no_first, 0, 0].tolist() + shifts[no_last, -1, -1].tolist()
+    if barred:
+        model.Add(cp_model.LinearExpr.Sum(barred) == 0)
+    return solve(model, shifts, options)
+
+
+def _stopped(reason: str, windows: list, started: float, proven: bool) -> dict:
+    """A result without a roster: ``INFEASIBLE`` if ``proven``, else ``UNKNOWN``.
+
+    A window may fail only because it ran out of time or because of what
+    earlier windows committed, which doesn't prove the horizon infeasible.
+    """
+    return {"solver_status": "INFEASIBLE" if proven else "UNKNOWN", "schedule": None, "objective": None,
+            "bound": None, "gap": None, "wall_time": time.perf_counter() - started, "mode": SEQUENTIAL,
+            "reason": reason, "windows": windows}
+
+
+def _window_summary(start: int, end: int, result: dict) -> dict:
+    return {"start": start, "end": end, "solver_status": result["solver_status"],
+            "objective": result["objective"], "wall_time": result["wall_time"]}
+
+
+def _finish(problem: Problem, schedule: list, windows: list, mode: str, started: float) -> dict:
+    schedule.sort(key=lambda nds: (nds[1], nds[0], nds[2]))
+    assigned = np.zeros((problem.num_nurses, problem.num_days, problem.num_shifts), dtype=bool)
+    assigned[tuple(np.asarray(schedule).T)] = True
+    return {
+        "solver_status": "FEASIBLE",
+        "schedule": schedule,
+        "objective": int((problem.shift_requests * assigned).sum()),
+        "bound": None,
+        "gap": None,
+        "wall_time": time.perf_counter() - started,
+        "mode": mode,
+        "windows": windows,
+    }
+
+
+def solve_sequential(problem: Problem, options: dict, window: int, overlap: int, pace_slack: Optional[int] = 1) -> dict:
+    started = time.perf_counter()
+    num_nurses, num_shifts, num_days = problem.num_nurses, problem.num_shifts, problem.num_days
+    min_total, max_total = fairness_bounds(num_nurses, num_shifts, num_days)
+    num_windows = max(1, math.ceil(max(0, num_days - window) / (window - overlap)) + 1)
+    window_options = dict(options, time_limit=options["time_limit"] / num_windows)
+
+    worked = np.zeros(num_nurses, dtype=np.int64)  # shifts committed so far, per nurse
+    no_first = []
+    schedule, windows = [], []
+    start = 0
+    while start < num_days:
+        end = min(start + window, num_days)
+        commit_end = end if end == num_days else end - overlap
+
+        # Window count bounds: every nurse can still reach the horizon minimum
+        # in the days after the window and never exceeds the maximum...
+        lower = min_total - worked - _remaining_capacity(num_shifts, num_days - end)
+        upper = max_total - worked
+        # ...and, if pacing, stays close to the even share of days [0, end).
+        paced_lower, paced_upper = lower, upper
+        if pace_slack is not None and end < num_days:
+            share = end * num_shifts / num_nurses
+            paced_lower = np.maximum(lower, math.floor(share) - pace_slack - worked)
+            paced_upper = np.minimum(upper, math.ceil(share) + pace_slack - worked)
+        lower, paced_lower = np.maximum(lower, 0), np.maximum(paced_lower, 0)
+        if (upper < lower).any():
+            return _stopped(f"fairness bounds can't be met after day {start}", windows, started, start == 0)
+
+        requests = problem.shift_requests[:, start:end]
+        holidays = problem.holiday_requests[:, start:end]
+        result = None
+        if (paced_upper >= paced_lower).all():
+            result = _solve_window(requests, holidays, paced_lower, paced_upper, no_first, [], window_options)
+        if result is None or result["schedule"] is None:
+            result = _solve_window(requests, holidays, lower, upper, no_first, [], window_options)
+        windows.append(_window_summary(start, end, result))
+        if result["schedule"] is None:
+            # Nothing is committed before the first window and its bounds only
+            # relax the horizon's, so only there does infeasibility carry over.
+            proven = start == 0 and result["solver_status"] == "INFEASIBLE"
+            return _stopped(f"window starting on day {start} has no feasible roster", windows, started, proven)
+
+        no_first = []
+        for n, d, s in result["schedule"]:
+            if d < commit_end - start:
+                schedule.append((n, start + d, s))
+                worked[n] += 1
+                if d == commit_end - start - 1 and s == num_shifts - 1:
+                    no_first.append(n)
+        start = commit_end
+    return _finish(problem, schedule, windows, SEQUENTIAL, started)
+
+
+def _block_quotas(problem: Problem, bounds: list, time_limit: float) -> Optional[np.ndarray]:
+    """Split every nurse's total shift count over the blocks, as evenly as availability allows."""
+    num_nurses, num_shifts = problem.num_nurses, problem.num_shifts
+    min_total, max_total = fairness_bounds(num_nurses, num_shifts, problem.num_days)
+    model = cp_model.CpModel()
+    quotas = np.empty((num_nurses, len(bounds)), dtype=object)
+    deviations = []
+    for b, (start, end) in enumerate(bounds):
+        available = (problem.holiday_requests[:, start:end] != 1).sum(axis=1)
+        share = round((end - start) * num_shifts / num_nurses)
+        for n in range(num_nurses):
+            capacity = min(int(available[n]), _remaining_capacity(num_shifts, end - start))
+            quotas[n, b] = model.NewIntVar(0, capacity, f"quota_n{n}_b{b}")
+            deviation = model.NewIntVar(0, end - start, f"deviation_n{n}_b{b}")
+            model.AddAbsEquality(deviation, quotas[n, b] - share)
+            deviations.append(deviation)
+        model.Add(cp_model.LinearExpr.Sum(quotas[:, b].tolist()) == (end - start) * num_shifts)
+    for n in range(num_nurses):
+        model.AddLinearConstraint(cp_model.LinearExpr.Sum(quotas[n].tolist()), min_total, max_total)
+    model.Minimize(cp_model.LinearExpr.Sum(deviations))
+
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = time_limit
+    if solver.Solve(model) not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        return None
+    return np.vectorize(solver.Value, otypes=[np.int64])(quotas)
+
+
+def solve_parallel(problem: Problem, options: dict, window: int, executor: Optional[Executor] = None) -> dict:
+    started = time.perf_counter()
+    num_nurses, num_shifts, num_days = problem.num_nurses, problem.num_shifts, problem.num_days
+    bounds = [(start, min(start + window, num_days)) for start in range(0, num_days, window)]
+    quotas = _block_quotas(problem, bounds, options["time_limit"] / 4)
+    if quotas is None:
+        return None
+
+    # At every edge only even nurses may take the last shift and only odd ones
+    # the next first shift, so no pair of blocks can break the rest rule.
+    even, odd = list(range(0, num_nurses, 2)), list(range(1, num_nurses, 2))
+    block_options = dict(options, time_limit=options["time_limit"] * 3 / 4)
+    if executor is not None:
+        # The blocks run at once, so they share the workers instead of each taking all of them.
+        block_options["num_search_workers"] = max(1, options["num_search_workers"] // len(bounds))
+    arguments = []
+    for b, (start, end) in enumerate(bounds):
+        no_first = even if start > 0 else []
+        no_last = odd if end < num_days else []
+        arguments.append((problem.shift_requests[:, start:end], problem.holiday_requests[:, start:end],
+                          quotas[:, b], quotas[:, b], no_first, no_last, block_options))
+    if executor is None:
+        results = [_solve_window(*args) for args in arguments]
+    else:
+        results = [future.result() for future in [executor.submit(_solve_window, *args) for args in arguments]]
+
+    schedule, windows = [], []
+    for (start, end), result in zip(bounds, results):
+        windows.append(_window_summary(start, end, result))
+        if result["schedule"] is None:
+            return None
+        schedule.extend((n, start + d, s) for n, d, s in result["schedule"])
+    return _finish(problem, schedule, windows, PARALLEL, started)
+
+
+def solve_horizon(problem: Problem, options: dict, horizon: dict, executor: Optional[Executor] = None) -> dict:
+    """Solve ``problem`` window by window as configured by horizon_options()."""
+    if horizon["mode"] == PARALLEL:
+        started = time.perf_counter()
+        result = solve_parallel(problem, options, horizon["window"], executor)
+        if result is not None:
+            return result
+        # The sequential fallback only gets what is left of the time limit.
+        remaining = options["time_limit"] - (time.perf_counter() - started)
+        if remaining <= 0:
+            return _stopped("parallel blocks found no roster within the time limit", [], started, False)
+        options = dict(options, time_limit=remaining)
+    return solve_sequential(problem, options, horizon["window"], horizon["overlap"], horizon["pace_slack"])
@@ -0,0 +1,132 @@
+"""Warm-started re-solve of a problem whose requests changed since the last roster.
+
+A client sends the problem as before plus the ``previous_schedule`` it got back
+from ``/schedule`` (a list of ``[n, d, s]`` triples) and, optionally, the
+``changes`` to apply on top of the problem::
+
+    {"holiday_requests": [[n, d, value], ...], "shift_requests": [[n, d, s, value], ...]}
+
+The previous roster seeds CP-SAT through solution hints. The objective becomes
+lexicographic: first the number of fulfilled shift requests, then the number
+of previous assignments kept. So the answer is an optimal roster that moves as
+few assignments as possible. With ``pin_unaffected`` the days that no change
+touches are fixed to their previous assignments. If that leaves no feasible
+roster, the solve is retried unpinned.
+"""
+import numpy as np
+from ortools.sat.python import cp_model
+
+from scheduling.model import ShiftModel, add_holidays, var_indices
+from scheduling.problem import Problem
+from scheduling.solve import make_solver, relative_gap, run_solver
+from scheduling.templates import ModelTemplateCache, default_cache
+
+
+def _rows(value, width: int):
+    """``value`` as an int64 ``(k, width)`` array, or None if it is anything else."""
+    try:
+        rows = np.asarray(value)
+    except (TypeError, ValueError):
+        return None
+    if rows.size == 0:
+        return np.zeros((0, width), dtype=np.int64)
+    # No reshaping, truncating or parsing: flat lists, floats and strings are errors.
+    if rows.ndim != 2 or rows.shape[1] != width or rows.dtype.kind not in "iu":
+        return None
+    return rows.astype(np.int64)
+
+
+def parse_previous_schedule(data: dict, problem: Problem) -> np.ndarray:
+    """Return the previous roster as a boolean ``[n, d, s]`` array."""
+    shape = (problem.num_nurses, problem.num_days, problem.num_shifts)
+    triples = _rows(data["previous_schedule"], 3)
+    if triples is None:
+        raise ValueError("'previous_schedule' must be a list of [nurse, day, shift] integer triples")
+    if ((triples < 0) | (triples >= shape)).any():
+        raise ValueError("'previous_schedule' refers to a nurse, day or shift out of range")
+    previous = np.zeros(shape, dtype=bool)
+    previous[tuple(triples.T)] = True
+    return previous
+
+
+def _entries(changes: dict, key: str, width: int, shape) -> np.ndarray:
+    entries = _rows(changes.get(key, []), width)
+    if entries is None:
+        raise ValueError(f"'changes.{key}' must be a list of {width}-element integer lists")
+    if ((entries[:, :-1] < 0) | (entries[:, :-1] >= shape)).any():
+        raise ValueError(f"'changes.{key}' refers to a nurse, day or shift out of range")
+    return entries
+
+
+def apply_changes(data: dict, problem: Problem, previous: np.ndarray):
+    """Apply the optional ``changes`` to ``problem``.
+
+    Returns the updated problem and a boolean mask of the days affected by the
+    changes or by previous assignments that now fall on a holiday.
+    """
+    changes = data.get("changes") or {}
+    if not isinstance(changes, dict):
+        raise ValueError("'changes' must be an object")
+    holidays = _entries(changes, "holiday_requests", 3, (problem.num_nurses, problem.num_days))
+    requests = _entries(changes, "shift_requests", 4, (problem.num_nurses, problem.num_days, problem.num_shifts))
+
+    holiday_requests = problem.holiday_requests.copy()
+    holiday_requests[holidays[:, 0], holidays[:, 1]] = holidays[:, 2]
+    shift_requests = problem.shift_requests.copy()
+    shift_requests[requests[:, 0], requests[:, 1], requests[:, 2]] = requests[:, 3]
+
+    affected = np.zeros(problem.num_days, dtype=bool)
+    affected[holidays[:, 1]] = True
+    affected[requests[:, 1]] = True
+    affected |= (previous.any(axis=2) & (holiday_requests == 1)).any(axis=0)
+    return problem._replace(shift_requests=shift_requests, holiday_requests=holiday_requests), affected
+
+
+def _build(problem: Problem, previous: np.ndarray, pinned_days, template_cache: ModelTemplateCache) -> ShiftModel:
+    model, shifts = template_cache.get(problem.num_nurses, problem.num_shifts, problem.num_days)
+    add_holidays(model, shifts, problem.holiday_requests)
+
+    # Requests met first, previous assignments kept second: the kept count is
+    # below `scale`, so it can never trade off against a fulfilled request.
+    scale = problem.num_days * problem.num_shifts + 1
+    weights = problem.shift_requests.reshape(shifts.shape) * scale + previous
+    mask = weights != 0
+    model.Maximize(cp_model.LinearExpr.WeightedSum(shifts[mask].tolist(), weights[mask].tolist()))
+
+    index = var_indices(shifts)
+    hint = model.Proto().solution_hint
+    hint.vars.extend(index.ravel().tolist())
+    hint.values.extend(previous.ravel().astype(int).tolist())
+
+    if pinned_days.any():
+        kept = shifts[:, pinned_days][previous[:, pinned_days]]
+        freed = shifts[:, pinned_days][~previous[:, pinned_days]]
+        model.Add(cp_model.LinearExpr.Sum(kept.tolist()) == kept.size)
+        model.Add(cp_model.LinearExpr.Sum(freed.tolist()) == 0)
+    return ShiftModel(model, shifts)
+
+
+def resolve(problem: Problem, previous: np.ndarray, affected_days: np.ndarray, options: dict,
+            pin_unaffected: bool = False, template_cache: ModelTemplateCache = default_cache) -> dict:
+    """Re-solve ``problem`` starting from ``previous`` and report the moved assignments."""
+    pinned_days = ~affected_days if pin_unaffected else np.zeros_like(affected_days)
+    model, shifts = _build(problem, previous, pinned_days, template_cache)
+    result = run_solver(make_solver(options), model, shifts)
+    if pinned_days.any() and result["schedule"] is None and result["solver_status"] == "INFEASIBLE":
+        pinned_days = np.zeros_like(affected_days)
+        model, shifts = _build(problem, previous, pinned_days, template_cache)
+        result = run_solver(make_solver(options), model, shifts)
+    result["pinned_days"] = np.flatnonzero(pinned_days).tolist()
+
+    if result["schedule"] is not None:
+        scale = problem.num_days * problem.num_shifts + 1
+        current = np.zeros_like(previous)
+        current[tuple(np.asarray(result["schedule"]).T)] = True
+        result["objective"] = int((problem.shift_requests * current).sum())
+        result["bound"] = int(result["bound"] // scale)
+        result["gap"] = relative_gap(result["objective"], result["bound"])
+        result["moved"] = {
+            "removed": np.argwhere(previous & ~current).tolist(),
+            "added": np.argwhere(current & ~previous).tolist(),
+        }
+    return result
@@ -0,0 +1,157 @@
+"""Asynchronous solve jobs run by a bounded pool of solver processes.
+
+``JobManager.submit`` queues a validated problem and returns a job id straight
+away; a worker process builds and solves the model. Each job has a watchdog
+thread in its worker that calls ``CpSolver.StopSearch`` when the job times out
+or is cancelled, so the best schedule found so far is still reported.
+"""
+import multiprocessing
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from scheduling.problem import Problem
+from scheduling.solve import build_problem_model, make_solver, run_solver
+from scheduling.templates import default_cache
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+class QueueFullError(Exception):
+    """Raised when the number of unfinished jobs reached ``max_queue``."""
+
+
+def _run_job(problem: Problem, options: dict, timeout: float, cancel_event) -> dict:
+    deadline = time.monotonic() + timeout
+    model, shifts = build_problem_model(problem, default_cache, options.get("symmetry_breaking", False))
+    solver = make_solver(options)
+    finished = threading.Event()
+    stop_reason = []
+
+    def watchdog():
+        while not finished.wait(0.1):
+            if cancel_event.is_set():
+                stop_reason.append(CANCELLED)
+            elif time.monotonic() >= deadline:
+                stop_reason.append("timeout")
+            else:
+                continue
+            solver.StopSearch()
+            return
+
+    thread = threading.Thread(target=watchdog, daemon=True)
+    thread.start()
+    try:
+        result = run_solver(solver, model, shifts)
+    finally:
+        finished.set()
+        thread.join()
+    result["stopped"] = stop_reason[0] if stop_reason else None
+    return result
+
+
+class Job:
+    def __init__(self, job_id: str, problem: Problem, future, cancel_event):
+        self.id = job_id
+        self.problem = problem
+        self.future = future
+        self.cancel_event = cancel_event
+        self.submitted_at = time.time()
+
+    @property
+    def state(self) -> str:
+        if self.future.cancelled():
+            return CANCELLED
+        if not self.future.done():
+            return RUNNING if self.future.running() else QUEUED
+        if self.future.exception() is not None:
+            return FAILED
+        return CANCELLED if self.cancel_event.is_set() else DONE
+
+    def to_dict(self) -> dict:
+        state = self.state
+        info = {"id": self.id, "state": state, "submitted_at": self.submitted_at}
+        if self.future.done() and not self.future.cancelled():
+            error = self.future.exception()
+            if error is not None:
+                info["error"] = str(error)
+            else:
+                info["result"] = self.future.result()
+        return info
+
+
+class JobManager:
+    """Bounded process pool plus an in-memory registry of submitted jobs.
+
+    The pool is started on the first submission so that importing the app
+    (or the Flask reloader parent) doesn't spawn solver processes.
+    """
+
+    def __init__(self, max_workers: int = 2, max_queue: int = 64, max_finished: int = 1000,
+                 default_timeout: float = 120.0):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.max_finished = max_finished
+        self.default_timeout = default_timeout
+        self._jobs = {}  # insertion ordered, oldest first
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._manager = None
+
+    def _start(self):
+        context = multiprocessing.get_context("spawn")
+        self._manager = context.Manager()
+        self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+
+    def submit(self, problem: Problem, options: dict, timeout: Optional[float] = None) -> Job:
+        with self._lock:
+            if self._queue_depth() >= self.max_queue:
+                raise QueueFullError(f"{self.max_queue} jobs are already queued or running")
+            if self._executor is None:
+                self._start()
+            cancel_event = self._manager.Event()
+            timeout = self.default_timeout if timeout is None else timeout
+            future = self._executor.submit(_run_job, problem, options, timeout, cancel_event)
+            job = Job(uuid.uuid4().hex, problem, future, cancel_event)
+            self._jobs[job.id] = job
+            self._prune()
+            return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Cancel a queued job, or stop a running one at its current best solution."""
+        job = self.get(job_id)
+        if job is not None and not job.future.cancel() and not job.future.done():
+            job.cancel_event.set()
+        return job
+
+    def queue_depth(self) -> int:
+        with self._lock:
+            return self._queue_depth()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            for job in self._jobs.values():
+                if not job.future.cancel() and not job.future.done():
+                    job.cancel_event.set()
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._manager.shutdown()
+                self._executor = self._manager = None
+
+    def _queue_depth(self) -> int:
+        return sum(1 for job in self._jobs.values() if not job.future.done())
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.future.done()]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
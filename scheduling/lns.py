@@ -0,0 +1,245 @@
+"""Large-neighborhood search for rosters too large for one CP-SAT model.
+
+``solve_lns`` starts from a greedy roster and repeatedly frees a
+neighborhood while every other assignment stays fixed:
+
+* ``days``: every nurse and shift on a block of consecutive days;
+* ``nurses``: a random subset of nurses over the whole horizon, who can
+  only trade the shifts they hold between themselves;
+* ``shift``: one shift column on a block of days.
+
+Only the free cells become variables, so a sub-model stays small however
+large the roster is. The fixed cells enter each constraint as constants.
+Within a sub-model the fairness bounds are soft, with a penalty larger than
+any number of requests, so a greedy start that misses them can be repaired.
+A sub-solution replaces the current roster when it has no more hard-rule
+violations and no fewer fulfilled requests.
+
+Several neighborhoods of one kind are solved at once when an executor is
+given. They are made independent: disjoint nurse subsets can't touch each
+other's shifts, and day blocks are at least a day apart and keep each
+nurse's number of shifts within the block.
+"""
+import time
+from concurrent.futures import Executor
+from typing import Optional
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+from scheduling.model import assignments_from_solution, fairness_bounds, schedule_from_assignments
+from scheduling.problem import Problem
+from scheduling.solve import make_solver
+from scheduling.validate import hard_violations
+
+DAYS = "days"
+NURSES = "nurses"
+SHIFT = "shift"
+KINDS = (DAYS, NURSES, SHIFT)
+
+
+def greedy_roster(problem: Problem) -> np.ndarray:
+    """A quick boolean ``[n, d, s]`` roster that balances shifts first and meets requests second.
+
+    Every shift goes to an available nurse. The rest rule and the fairness
+    maximum are only broken when no nurse could take the shift otherwise.
+    """
+    num_nurses, num_days, num_shifts = problem.num_nurses, problem.num_days, problem.num_shifts
+    _, max_shifts = fairness_bounds(num_nurses, num_shifts, num_days)
+    available = problem.holiday_requests != 1
+    roster = np.zeros((num_nurses, num_days, num_shifts), dtype=bool)
+    worked = np.zeros(num_nurses, dtype=np.int64)
+    requests = problem.shift_requests.astype(np.float64)
+    for day in range(num_days):
+        free = available[:, day].copy()
+        for shift in range(num_shifts):
+            rested = ~roster[:, day - 1, -1] if shift == 0 and day > 0 else np.ones(num_nurses, dtype=bool)
+            under = worked < max_shifts
+            for eligible in (free & rested & under, free & rested, free, ~roster[:, day].any(axis=1)):
+                if eligible.any():
+                    break
+            # Fewest shifts so far first, then the strongest request, then the lowest id.
+            priority = np.where(eligible, requests[:, day, shift] / (1 + requests.max()) - worked, -np.inf)
+            nurse = int(np.argmax(priority))
+            roster[nurse, day, shift] = True
+            worked[nurse] += 1
+            free[nurse] = False
+    return roster
+
+
+def score(roster: np.ndarray, problem: Problem) -> tuple:
+    """``(-violations, objective)``: larger is better."""
+    violations = int(hard_violations(roster.reshape(1, -1), problem)[0])
+    return -violations, int(problem.shift_requests[roster].sum())
+
+
+def _linear(model: cp_model.CpModel, literals, coeffs, lower: int, upper: int) -> None:
+    linear = model.Proto().constraints.add().linear
+    linear.vars.extend(literals)
+    linear.coeffs.extend(coeffs)
+    linear.domain.extend((int(lower), int(upper)))
+
+
+def improve(problem: Problem, current: np.ndarray, free: np.ndarray, options: dict, pin_counts: bool = False):
+    """Re-optimize the cells of ``current`` selected by ``free`` with everything else fixed.
+
+    Returns the new values of the free cells, in ``current[free]`` order, or
+    None if no solution was found.
+    """
+    fixed = current & ~free
+    model = cp_model.CpModel()
+    cells = np.argwhere(free)
+    for _ in range(len(cells)):
+        model.NewBoolVar("")
+    index = np.full(free.shape, -1, dtype=np.int64)
+    index[free] = np.arange(len(cells))
+
+    # No shift on a day off
+    off = free & (problem.holiday_requests == 1)[:, :, None]
+    if off.any():
+        _linear(model, index[off].tolist(), [1] * int(off.sum()), 0, 0)
+
+    # Each shift is assigned to exactly one nurse on each day
+    for day, shift in np.argwhere(free.any(axis=0)).tolist():
+        literals = index[:, day, shift][free[:, day, shift]].tolist()
+        rhs = max(0, 1 - int(fixed[:, day, shift].sum()))
+        _linear(model, literals, [1] * len(literals), rhs, rhs)
+
+    # Each nurse works at most one shift per day
+    for nurse, day in np.argwhere(free.any(axis=2)).tolist():
+        literals = index[nurse, day][free[nurse, day]].tolist()
+        _linear(model, literals, [1] * len(literals), 0, max(0, 1 - int(fixed[nurse, day].sum())))
+
+    # No last shift of day d followed by the first shift of day d+1
+    last, first = (slice(None), slice(None, -1), -1), (slice(None), slice(1, None), 0)
+    pair_free = np.stack([free[last], free[first]], axis=-1)
+    pair_fixed = fixed[last].astype(np.int64) + fixed[first]
+    pair_index = np.stack([index[last], index[first]], axis=-1)
+    for nurse, day in np.argwhere(pair_free.any(axis=2)).tolist():
+        literals = pair_index[nurse, day][pair_free[nurse, day]].tolist()
+        _linear(model, literals, [1] * len(literals), 0, max(0, 1 - int(pair_fixed[nurse, day])))
+
+    # Fairness: soft bounds on each nurse's total, or the block count kept as it is
+    min_shifts, max_shifts = fairness_bounds(problem.num_nurses, problem.num_shifts, problem.num_days)
+    requests = problem.shift_requests[free]
+    penalty = int(np.maximum(requests, 0).sum()) + 1
+    objective_vars, objective_coeffs = list(range(len(cells))), requests.tolist()
+    for nurse in np.flatnonzero(free.any(axis=(1, 2))).tolist():
+        literals = index[nurse][free[nurse]].tolist()
+        ones = [1] * len(literals)
+        if pin_counts:
+            count = int(current[nurse][free[nurse]].sum())
+            _linear(model, literals, ones, count, count)
+            continue
+        worked = int(fixed[nurse].sum())
+        slack = model.NewIntVar(0, problem.num_days * problem.num_shifts, "").Index()
+        _linear(model, literals + [slack], ones + [1], min_shifts - worked, cp_model.INT_MAX)
+        _linear(model, literals + [slack], ones + [-1], cp_model.INT_MIN, max_shifts - worked)
+        objective_vars.append(slack)
+        objective_coeffs.append(-penalty)
+
+    # Maximize, written into the proto like scheduling.model.set_objective
+    objective = model.Proto().objective
+    objective.vars.extend(objective_vars)
+    objective.coeffs.extend((-np.asarray(objective_coeffs, dtype=np.int64)).tolist())
+    objective.scaling_factor = -1
+    hint = model.Proto().solution_hint
+    hint.vars.extend(range(len(cells)))
+    hint.values.extend(current[free].astype(int).tolist())
+
+    solver = make_solver(options)
+    status = solver.Solve(model)
+    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        return None
+    return assignments_from_solution(solver.ResponseProto().solution, np.arange(len(cells)))
+
+
+def _day_blocks(rng: np.random.Generator, num_days: int, length: int, count: int) -> list:
+    """Up to ``count`` blocks of ``length`` days, at least one day apart."""
+    length = min(length, num_days)
+    offset = int(rng.integers(0, length + 1))
+    starts = np.arange(offset, num_days - length + 1, length + 1)
+    if starts.size == 0:
+        starts = np.array([num_days - length])
+    starts = rng.permutation(starts)[:count]
+    return [slice(int(start), int(start) + length) for start in starts]
+
+
+def neighborhoods(kind: str, rng: np.random.Generator, problem: Problem, lns: dict, count: int) -> list:
+    """``count`` or fewer independent boolean ``[n, d, s]`` masks of cells to free."""
+    shape = (problem.num_nurses, problem.num_days, problem.num_shifts)
+    masks = []
+    if kind == NURSES:
+        size = min(lns["nurses"], problem.num_nurses)
+        order = rng.permutation(problem.num_nurses)
+        for i in range(min(count, max(1, problem.num_nurses // size))):
+            mask = np.zeros(shape, dtype=bool)
+            mask[order[i * size:(i + 1) * size]] = True
+            masks.append(mask)
+        return masks
+    length = lns["days"] if kind == DAYS else 2 * lns["days"]
+    for block in _day_blocks(rng, problem.num_days, length, count):
+        mask = np.zeros(shape, dtype=bool)
+        if kind == DAYS:
+            mask[:, block] = True
+        else:
+            mask[:, block, int(rng.integers(problem.num_shifts))] = True
+        masks.append(mask)
+    return masks
+
+
+def solve_lns(problem: Problem, options: dict, lns: dict, executor: Optional[Executor] = None) -> dict:
+    """Improve a greedy roster by neighborhood re-optimization until the time limit.
+
+    With an executor, ``options["num_search_workers"]`` neighborhoods are
+    solved at once, each with one CP-SAT worker. Otherwise one neighborhood
+    at a time gets all the workers.
+    """
+    started = time.perf_counter()
+    deadline = started + options["time_limit"]
+    rng = np.random.default_rng(lns["seed"])
+    parallel = executor is not None and options["num_search_workers"] > 1
+    count = options["num_search_workers"] if parallel else 1
+    sub_options = dict(options, num_search_workers=1) if parallel else dict(options)
+
+    current = greedy_roster(problem)
+    best = score(current, problem)
+    trace = [[time.perf_counter() - started, best[1], -best[0]]]
+    iterations = improvements = 0
+    while iterations < lns["max_iterations"]:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0.05:
+            break
+        kind = KINDS[iterations % len(KINDS)]
+        masks = neighborhoods(kind, rng, problem, lns, count)
+        pin_counts = kind != NURSES and len(masks) > 1
+        sub_options["time_limit"] = min(lns["sub_time_limit"], remaining)
+        if parallel:
+            futures = [executor.submit(improve, problem, current, mask, sub_options, pin_counts) for mask in masks]
+            results = [future.result() for future in futures]
+        else:
+            results = [improve(problem, current, mask, sub_options, pin_counts) for mask in masks]
+        iterations += 1
+        for mask, values in zip(masks, results):
+            if values is None:
+                continue
+            candidate = current.copy()
+            candidate[mask] = values
+            candidate_score = score(candidate, problem)
+            if candidate_score >= best:
+                if candidate_score > best:
+                    improvements += 1
+                    trace.append([time.perf_counter() - started, candidate_score[1], -candidate_score[0]])
+                current, best = candidate, candidate_score
+
+    violations, objective = -best[0], best[1]
+    return {
+        "solver_status": "FEASIBLE" if violations == 0 else "UNKNOWN",
+        "schedule": schedule_from_assignments(current) if violations == 0 else None,
+        "objective": float(objective) if violations == 0 else None,
+        "bound": None,
+        "gap": None,
+        "wall_time": time.perf_counter() - started,
+        "violations": violations,
+        "lns": {"iterations": iterations, "improvements": improvements, "trace": trace},
+    }
@@ -0,0 +1,140 @@
+"""Array-backed CP-SAT model for the nurse scheduling problem.
+
+The shift variables live in a NumPy object array indexed as
+``shifts[n, d, s]`` so every constraint family can be added by slicing the
+array instead of walking nested Python loops.
+"""
+from typing import NamedTuple, Tuple
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+
+class ShiftModel(NamedTuple):
+    model: cp_model.CpModel
+    shifts: np.ndarray  # shifts[n, d, s]: nurse 'n' works shift 's' on day 'd'
+
+
+def fairness_bounds(num_nurses: int, num_shifts: int, num_days: int) -> Tuple[int, int]:
+    """Return the (min, max) number of shifts each nurse must work."""
+    min_shifts_per_nurse = (num_shifts * num_days) // num_nurses
+    max_shifts_per_nurse = min_shifts_per_nurse + (1 if num_shifts * num_days % num_nurses != 0 else 0)
+    return min_shifts_per_nurse, max_shifts_per_nurse
+
+
+def new_shift_vars(model: cp_model.CpModel, num_nurses: int, num_shifts: int, num_days: int) -> np.ndarray:
+    shifts = np.empty((num_nurses, num_days, num_shifts), dtype=object)
+    shifts.reshape(-1)[:] = [
+        model.NewBoolVar(f"shift_n{n}_d{d}_s{s}")
+        for n in range(num_nurses)
+        for d in range(num_days)
+        for s in range(num_shifts)
+    ]
+    return shifts
+
+
+def var_indices(shifts: np.ndarray) -> np.ndarray:
+    """Return the proto variable index of every entry of ``shifts``, same shape."""
+    return np.fromiter((v.Index() for v in shifts.flat), dtype=np.int64, count=shifts.size).reshape(shifts.shape)
+
+
+def add_structural_constraints(model: cp_model.CpModel, shifts: np.ndarray, min_shifts=None, max_shifts=None) -> None:
+    """Add the constraints that only depend on the problem shape.
+
+    ``min_shifts``/``max_shifts`` override the even-distribution bounds with a
+    scalar or per-nurse array, for sub-problems covering part of the horizon.
+
+    The constraints are written straight into the model proto from the
+    variable index array; going through ``AddExactlyOne``/``Add`` would
+    re-validate every literal in Python and dominate the build time.
+    """
+    num_nurses, num_days, num_shifts = shifts.shape
+    index = var_indices(shifts)
+    constraints = model.Proto().constraints
+
+    # Each shift is assigned to exactly one nurse on each day
+    for column in index.reshape(num_nurses, -1).T.tolist():
+        constraints.add().exactly_one.literals.extend(column)
+
+    # Each nurse works at most one shift per day
+    for row in index.reshape(-1, num_shifts).tolist():
+        constraints.add().at_most_one.literals.extend(row)
+
+    # Distribute the shifts evenly among nurses
+    min_shifts_per_nurse, max_shifts_per_nurse = fairness_bounds(num_nurses, num_shifts, num_days)
+    lower = np.broadcast_to(min_shifts_per_nurse if min_shifts is None else min_shifts, num_nurses).tolist()
+    upper = np.broadcast_to(max_shifts_per_nurse if max_shifts is None else max_shifts, num_nurses).tolist()
+    ones = [1] * (num_days * num_shifts)
+    for row, lo, hi in zip(index.reshape(num_nurses, -1).tolist(), lower, upper):
+        linear = constraints.add().linear
+        linear.vars.extend(row)
+        linear.coeffs.extend(ones)
+        linear.domain.extend((int(lo), int(hi)))
+
+    # Prevent a nurse from working the last shift of day d and the first shift of day d+1
+    for last, first in zip(index[:, :-1, -1].ravel().tolist(), index[:, 1:, 0].ravel().tolist()):
+        constraints.add().at_most_one.literals.extend((last, first))
+
+
+def add_holidays(model: cp_model.CpModel, shifts: np.ndarray, holiday_requests) -> None:
+    """Forbid every shift on the days a nurse asked to have off."""
+    off = shifts[np.asarray(holiday_requests) == 1]
+    if off.size:
+        linear = model.Proto().constraints.add().linear
+        linear.vars.extend(v.Index() for v in off.flat)
+        linear.coeffs.extend([1] * off.size)
+        linear.domain.extend((0, 0))
+
+
+def set_objective(model: cp_model.CpModel, shifts: np.ndarray, shift_requests) -> None:
+    """Maximize the number of fulfilled shift requests.
+
+    Written into the proto like ``model.Maximize`` would: CP-SAT minimizes,
+    so the coefficients are negated and the scaling factor is -1.
+    """
+    requests = np.asarray(shift_requests, dtype=np.int64).reshape(shifts.shape)
+    requested = requests != 0
+    model.ClearObjective()
+    objective = model.Proto().objective
+    objective.vars.extend(v.Index() for v in shifts[requested])
+    objective.coeffs.extend((-requests[requested]).tolist())
+    objective.scaling_factor = -1
+
+
+def build_model(num_nurses: int, num_shifts: int, num_days: int, shift_requests, holiday_requests) -> ShiftModel:
+    model = cp_model.CpModel()
+    shifts = new_shift_vars(model, num_nurses, num_shifts, num_days)
+    add_structural_constraints(model, shifts)
+    add_holidays(model, shifts, holiday_requests)
+    set_objective(model, shifts, shift_requests)
+    return ShiftModel(model, shifts)
+
+
+def extract_assignments(solver: cp_model.CpSolver, shifts: np.ndarray) -> np.ndarray:
+    """Boolean ``[n, d, s]`` array of the last solution, read from the response in one pass."""
+    return assignments_from_solution(solver.ResponseProto().solution, var_indices(shifts))
+
+
+def extract_schedule(solver: cp_model.CpSolver, shifts: np.ndarray):
+    """Return the assigned (nurse, day, shift) triples ordered by day, then nurse."""
+    return schedule_from_assignments(extract_assignments(solver, shifts))
+
+
+def assignments_from_solution(solution, index: np.ndarray) -> np.ndarray:
+    """Boolean ``[n, d, s]`` array from a response's flat ``solution`` values."""
+    return np.asarray(solution, dtype=np.int64)[index] == 1
+
+
+def schedule_from_assignments(assigned: np.ndarray) -> list:
+    """(nurse, day, shift) triples of a boolean ``[n, d, s]`` array, ordered by day, then nurse."""
+    day_nurse_shift = np.argwhere(assigned.transpose(1, 0, 2))
+    return list(map(tuple, day_nurse_shift[:, [1, 0, 2]].tolist()))
+
+
+def roster_from_schedule(schedule, num_days: int, num_shifts: int) -> np.ndarray:
+    """``roster[d, s]``: the nurse working shift ``s`` on day ``d``, or -1 if nobody does."""
+    roster = np.full((num_days, num_shifts), -1, dtype=np.int64)
+    if len(schedule):
+        nurses, days, shifts = np.asarray(schedule, dtype=np.int64).T
+        roster[days, shifts] = nurses
+    return roster
@@ -0,0 +1,145 @@
+"""Decode ``/schedule`` payloads sent as binary bodies instead of JSON.
+
+* ``application/msgpack``: the same map as the JSON payload, dense or sparse.
+  This needs the optional ``msgpack`` package.
+* ``application/x-npz``: a NumPy archive with the arrays ``shift_requests``
+  and ``holiday_requests`` or their sparse forms ``<name>_indices`` and
+  optionally ``<name>_values``. ``num_nurses``, ``num_shifts`` and
+  ``num_days`` are scalars that can be left out when a dense array gives the
+  shape. Any other payload keys (``solver``, ``horizon``...) go in an
+  ``options`` string holding a JSON object.
+* ``application/x-npy``: a single dense ``shift_requests`` array with no
+  holidays, sized by its shape.
+
+Arrays are loaded with ``allow_pickle=False`` and handed to ``parse_problem``
+as they are. Each array's header is read first, and arrays larger than the
+sparse indices of the largest problem ``parse_problem`` accepts are rejected
+before anything is decompressed or allocated.
+"""
+import io
+import json
+import math
+import zipfile
+
+import numpy as np
+
+from scheduling.problem import MAX_CELLS
+
+MSGPACK = "application/msgpack"
+NPZ = "application/x-npz"
+NPY = "application/x-npy"
+MIMETYPES = {MSGPACK, "application/x-msgpack", NPZ, NPY}
+
+_SIZES = ("num_nurses", "num_shifts", "num_days")
+_MATRICES = ("shift_requests", "holiday_requests")
+# Room for int64 (nurse, day, shift) indices of every cell of the largest problem.
+MAX_ARRAY_BYTES = MAX_CELLS * 3 * 8
+
+
+def _array_bytes(fp) -> int:
+    """Size of the array in a .npy stream, from its header alone."""
+    version = np.lib.format.read_magic(fp)
+    if version == (1, 0):
+        shape, _, dtype = np.lib.format.read_array_header_1_0(fp)
+    elif version == (2, 0):
+        shape, _, dtype = np.lib.format.read_array_header_2_0(fp)
+    else:
+        raise ValueError(f"unsupported .npy format version {version}")
+    return math.prod(shape) * dtype.itemsize
+
+
+def _check_sizes(sizes: dict) -> None:
+    for name, size in sizes.items():
+        if size > MAX_ARRAY_BYTES:
+            raise ValueError(f"'{name}' is larger than {MAX_ARRAY_BYTES} bytes")
+
+
+def _load_msgpack(body: bytes) -> dict:
+    try:
+        import msgpack
+    except ImportError:
+        raise ValueError("msgpack bodies need the 'msgpack' package on the server") from None
+    try:
+        return msgpack.unpackb(body, strict_map_key=False)
+    except Exception as e:
+        raise ValueError(f"malformed msgpack body: {e}") from None
+
+
+def _load_npz(body: bytes) -> dict:
+    if not body.startswith(b"PK"):
+        raise ValueError("body is not a .npz archive")
+    try:
+        with zipfile.ZipFile(io.BytesIO(body)) as archive:
+            sizes = {}
+            for info in archive.infolist():
+                with archive.open(info) as fp:
+                    sizes[info.filename.removesuffix(".npy")] = _array_bytes(fp)
+    except (OSError, ValueError, zipfile.BadZipFile) as e:
+        raise ValueError(f"malformed .npz body: {e}") from None
+    _check_sizes(sizes)
+    try:
+        archive = np.load(io.BytesIO(body), allow_pickle=False)
+        arrays = {name: archive[name] for name in archive.files}
+    except (OSError, ValueError, zipfile.BadZipFile) as e:
+        raise ValueError(f"malformed .npz body: {e}") from None
+
+    data = {}
+    if "options" in arrays:
+        try:
+            data = json.loads(str(arrays.pop("options")))
+        except json.JSONDecodeError:
+            raise ValueError("'options' must be a JSON object") from None
+        if not isinstance(data, dict):
+            raise ValueError("'options' must be a JSON object")
+    for key in _MATRICES:
+        if key in arrays:
+            data[key] = arrays.pop(key)
+        elif f"{key}_indices" in arrays:
+            data[key] = {"indices": arrays.pop(f"{key}_indices")}
+            if f"{key}_values" in arrays:
+                data[key]["values"] = arrays.pop(f"{key}_values")
+    for key in _SIZES:
+        if key in arrays:
+            if arrays[key].ndim != 0:
+                raise ValueError(f"'{key}' must be a scalar")
+            data[key] = arrays.pop(key)[()]
+    if arrays:
+        raise ValueError(f"unexpected arrays in .npz body: {sorted(arrays)}")
+
+    # Sizes not given explicitly come from the dense arrays' shapes.
+    for key, names in zip(_MATRICES, (("num_nurses", "num_days", "num_shifts"), ("num_nurses", "num_days"))):
+        if isinstance(data.get(key), np.ndarray) and data[key].ndim == len(names):
+            for name, size in zip(names, data[key].shape):
+                data.setdefault(name, size)
+    return data
+
+
+def _load_npy(body: bytes) -> dict:
+    if not body.startswith(b"\x93NUMPY"):
+        raise ValueError("body is not a .npy array")
+    try:
+        size = _array_bytes(io.BytesIO(body))
+    except (OSError, ValueError) as e:
+        raise ValueError(f"malformed .npy body: {e}") from None
+    _check_sizes({"shift_requests": size})
+    try:
+        shift_requests = np.load(io.BytesIO(body), allow_pickle=False)
+    except (OSError, ValueError) as e:
+        raise ValueError(f"malformed .npy body: {e}") from None
+    if shift_requests.ndim != 3:
+        raise ValueError("a .npy body must be a (nurses, days, shifts) shift_requests array")
+    num_nurses, num_days, num_shifts = shift_requests.shape
+    return {"num_nurses": num_nurses, "num_shifts": num_shifts, "num_days": num_days,
+            "shift_requests": shift_requests,
+            "holiday_requests": np.zeros((num_nurses, num_days), dtype=np.int64)}
+
+
+def load_payload(body: bytes, mimetype: str) -> dict:
+    """Decode a binary request body of one of ``MIMETYPES``, raising ValueError if it is malformed."""
+    if mimetype == NPZ:
+        return _load_npz(body)
+    if mimetype == NPY:
+        return _load_npy(body)
+    if mimetype in MIMETYPES:
+        return _load_msgpack(body)
+    raise ValueError(f"unsupported content type '{mimetype}'")
@@ -0,0 +1,98 @@
+"""Validated scheduling problem parsed from a ``/schedule`` payload.
+
+``shift_requests`` and ``holiday_requests`` are given either dense (nested
+lists, or arrays from a binary body) or sparse as
+``{"indices": [[n, d, s], ...], "values": [...]}``. In the sparse form
+``values`` defaults to 1 and missing entries are 0. Both forms are checked
+as whole arrays, so even large problems are never walked entry by entry.
+"""
+from typing import NamedTuple
+
+import numpy as np
+
+# Limits checked before anything is allocated: the sparse form makes a huge
+# shape a short payload, and every cell becomes a model variable.
+MAX_NURSES = 5000
+MAX_SHIFTS = 24
+MAX_DAYS = 731
+MAX_CELLS = 1_000_000
+
+
+class Problem(NamedTuple):
+    num_nurses: int
+    num_shifts: int
+    num_days: int
+    shift_requests: np.ndarray  # shift_requests[n, d, s], int
+    holiday_requests: np.ndarray  # holiday_requests[n, d], 1 for a day off
+
+
+def _size(data: dict, key: str, maximum: int) -> int:
+    value = data.get(key)
+    if isinstance(value, np.integer):
+        value = int(value)
+    if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+        raise ValueError(f"'{key}' must be a positive integer")
+    if value > maximum:
+        raise ValueError(f"'{key}' must be at most {maximum}")
+    return value
+
+
+def _int_array(value, key: str) -> np.ndarray:
+    if isinstance(value, np.ndarray):
+        if value.dtype.kind not in "biu":
+            raise ValueError(f"'{key}' must hold integers, got {value.dtype}")
+        return value.astype(np.int64, copy=False)
+    try:
+        array = np.asarray(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"'{key}' must be a nested list of integers") from None
+    # Floats and strings are rejected rather than truncated or parsed; an empty list is float.
+    if array.dtype.kind not in "biu" and array.size:
+        raise ValueError(f"'{key}' must be a nested list of integers")
+    return array.astype(np.int64)
+
+
+def _sparse(raw: dict, key: str, shape) -> np.ndarray:
+    if "indices" not in raw:
+        raise ValueError(f"sparse '{key}' needs 'indices'")
+    indices = _int_array(raw["indices"], f"{key}.indices")
+    if indices.size == 0:
+        indices = indices.reshape(0, len(shape))
+    if indices.ndim != 2 or indices.shape[1] != len(shape):
+        raise ValueError(f"'{key}.indices' must be a list of {len(shape)}-element coordinates")
+    if ((indices < 0) | (indices >= np.asarray(shape))).any():
+        raise ValueError(f"'{key}.indices' out of range for shape {list(shape)}")
+    values = _int_array(raw.get("values", 1), f"{key}.values")
+    if values.ndim > 1 or (values.ndim == 1 and len(values) != len(indices)):
+        raise ValueError(f"'{key}.values' must have one entry per index")
+    flat = np.ravel_multi_index(tuple(indices.T), shape)
+    if np.unique(flat).size != flat.size:
+        raise ValueError(f"'{key}.indices' contains duplicates")
+    array = np.zeros(shape, dtype=np.int64)
+    array.reshape(-1)[flat] = values
+    return array
+
+
+def _matrix(data: dict, key: str, shape) -> np.ndarray:
+    if key not in data:
+        raise ValueError(f"'{key}' is required")
+    if isinstance(data[key], dict):
+        return _sparse(data[key], key, shape)
+    array = _int_array(data[key], key)
+    if array.shape != shape:
+        raise ValueError(f"'{key}' must have shape {list(shape)}, got {list(array.shape)}")
+    return array
+
+
+def parse_problem(data) -> Problem:
+    """Build a Problem from a request payload, raising ValueError if it is malformed."""
+    if not isinstance(data, dict):
+        raise ValueError("payload must be a JSON object")
+    num_nurses = _size(data, "num_nurses", MAX_NURSES)
+    num_shifts = _size(data, "num_shifts", MAX_SHIFTS)
+    num_days = _size(data, "num_days", MAX_DAYS)
+    if num_nurses * num_days * num_shifts > MAX_CELLS:
+        raise ValueError(f"num_nurses * num_days * num_shifts must be at most {MAX_CELLS}")
+    shift_requests = _matrix(data, "shift_requests", (num_nurses, num_days, num_shifts))
+    holiday_requests = _matrix(data, "holiday_requests", (num_nurses, num_days))
+    return Problem(num_nurses, num_shifts, num_days, shift_requests, holiday_requests)
@@ -0,0 +1,95 @@
+"""Vectorized QUBO for the nurse scheduling problem, for the D-Wave path.
+
+Variable ``get_index(n, d, s) = n * num_days * num_shifts + d * num_shifts + s``
+is 1 when nurse ``n`` works shift ``s`` on day ``d``, as in
+Dwave/work_schedule_dwave.py. The terms are the ones that script built in
+nested loops:
+
+* hard nurse: ``a`` for consecutive shifts on the same day and for the last
+  shift of a day followed by the first shift of the next;
+* hard shift: ``lagrange_hard_shift * (sum_n x - workforce)^2`` per shift;
+* soft nurse: the even-distribution penalty towards ``min_duty_days``;
+* ``penalty_off_day`` on every shift of a requested holiday;
+* ``request_bonus`` subtracted for every requested shift.
+
+Each family is generated as index arrays and handed to
+``BinaryQuadraticModel.from_numpy_vectors``, which sums duplicate pairs.
+"""
+from typing import NamedTuple
+
+import numpy as np
+from dimod import BinaryQuadraticModel
+
+from scheduling.problem import Problem
+
+
+class QuboWeights(NamedTuple):
+    a: float = 3.5
+    lagrange_hard_shift: float = 1.3
+    lagrange_soft_nurse: float = 0.5
+    penalty_off_day: float = 10.0
+    request_bonus: float = 0.0
+    workforce: int = 1
+    effort: int = 1
+    preference: int = 1
+
+
+def get_index(nurse_index, day_index, shift_index, num_days: int, num_shifts: int):
+    """Flat variable index; works elementwise on arrays."""
+    return nurse_index * num_days * num_shifts + day_index * num_shifts + shift_index
+
+
+def get_nurse_day_shift(index, num_days: int, num_shifts: int):
+    nurse_index, remainder = np.divmod(index, num_days * num_shifts)
+    day_index, shift_index = np.divmod(remainder, num_shifts)
+    return nurse_index, day_index, shift_index
+
+
+def _pairs(index: np.ndarray, axis: int) -> tuple:
+    """All (i, j) pairs of ``index`` entries that differ only along ``axis``, i < j."""
+    first, second = np.triu_indices(index.shape[axis], 1)
+    return np.take(index, first, axis=axis).ravel(), np.take(index, second, axis=axis).ravel()
+
+
+def build_qubo(problem: Problem, weights: QuboWeights = QuboWeights()) -> BinaryQuadraticModel:
+    num_nurses, num_shifts, num_days = problem.num_nurses, problem.num_shifts, problem.num_days
+    w = weights
+    min_duty_days = int(num_days * num_shifts / num_nurses)
+    nurses, days, shifts = np.ogrid[:num_nurses, :num_days, :num_shifts]
+    index = get_index(nurses, days, shifts, num_days, num_shifts).astype(np.int64)
+
+    linear = np.full(index.size, w.lagrange_hard_shift * (w.effort ** 2 - 2 * w.workforce * w.effort)
+                     + w.lagrange_soft_nurse * (w.preference ** 2 - 2 * min_duty_days * w.preference))
+    linear[index[problem.holiday_requests == 1].ravel()] += w.penalty_off_day
+    linear -= w.request_bonus * problem.shift_requests.reshape(-1)
+
+    rows, cols, biases = [], [], []
+
+    def add(pair, bias):
+        rows.append(pair[0])
+        cols.append(pair[1])
+        biases.append(np.full(pair[0].size, bias))
+
+    # Hard nurse constraint: no nurse works two consecutive shifts
+    add((index[:, :, :-1].ravel(), index[:, :, 1:].ravel()), w.a)
+    # Hard nurse constraint: no nurse works last shift of one day and first shift of next day
+    add((index[:, :-1, -1].ravel(), index[:, 1:, 0].ravel()), w.a)
+    # Hard shift constraint: `workforce` nurses working per shift each day
+    add(_pairs(index, 0), 2 * w.lagrange_hard_shift * w.effort ** 2)
+    # Soft nurse constraint: even distribution of work days
+    add(_pairs(index, 2), 2 * w.lagrange_soft_nurse * w.preference ** 2)
+
+    offset = (w.lagrange_hard_shift * num_days * num_shifts * w.workforce ** 2
+              + w.lagrange_soft_nurse * num_nurses * min_duty_days ** 2)
+    quadratic = (np.concatenate(rows), np.concatenate(cols), np.concatenate(biases))
+    return BinaryQuadraticModel.from_numpy_vectors(linear, quadratic, offset, "BINARY")
+
+
+def sample_schedule(sample, problem: Problem) -> list:
+    """Turn a sample (mapping or array over variable indices) into (n, d, s) triples."""
+    if isinstance(sample, dict) or hasattr(sample, "keys"):
+        values = np.array([sample[i] for i in range(problem.num_nurses * problem.num_days * problem.num_shifts)])
+    else:
+        values = np.asarray(sample)
+    n, d, s = get_nurse_day_shift(np.flatnonzero(values == 1), problem.num_days, problem.num_shifts)
+    return sorted(zip(n.tolist(), d.tolist(), s.tolist()))
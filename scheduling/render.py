@@ -0,0 +1,111 @@
+"""Schedule images rendered off the request path and cached by schedule hash.
+
+Schedules returned by the API are registered under a content hash. An image
+is rendered on first request by a small thread pool, then served from memory
+until it is evicted. A schedule is drawn as one raster (``imshow``) of nurses
+x (day, shift) cells instead of one ``Rectangle`` patch per assignment. A
+standalone ``Figure`` is used instead of pyplot, so concurrent renders share
+no global state and nothing is written to disk. Matplotlib is imported on
+the first render, so starting the API doesn't pay for it.
+"""
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+
+import numpy as np
+
+COLORS = ['blue', 'red', 'green', 'orange', 'purple']
+FORMATS = {"png": "image/png", "svg": "image/svg+xml"}
+MAX_LABELED_TICKS = 60
+
+
+def schedule_id(num_nurses: int, num_shifts: int, num_days: int, schedule) -> str:
+    triples = np.asarray(sorted(map(tuple, schedule)), dtype=np.int64)
+    digest = hashlib.sha256(np.asarray([num_nurses, num_shifts, num_days], dtype=np.int64).tobytes())
+    digest.update(triples.tobytes())
+    return digest.hexdigest()[:32]
+
+
+def render_schedule(schedule, n_days: int, n_shifts: int, n_nurses: int, fmt: str = "png") -> bytes:
+    from matplotlib.colors import to_rgba_array
+    from matplotlib.figure import Figure
+
+    raster = np.zeros((n_nurses, n_days * n_shifts, 4))
+    if len(schedule):
+        nurse, day, shift = np.asarray(schedule, dtype=np.int64).T
+        raster[nurse, day * n_shifts + shift] = to_rgba_array(COLORS)[nurse % len(COLORS)]
+
+    fig = Figure()
+    ax = fig.add_subplot(111)
+    ax.imshow(raster, origin="lower", interpolation="nearest", aspect="auto",
+              extent=(-0.5, n_days * n_shifts - 0.5, -0.5, n_nurses - 0.5))
+    if n_days * n_shifts <= MAX_LABELED_TICKS:
+        ax.set_xticks(range(n_days * n_shifts))
+    if n_nurses <= MAX_LABELED_TICKS:
+        ax.set_yticks(range(n_nurses))
+    ax.set_xlabel("Shifts")
+    ax.set_ylabel("Nurses")
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=fmt)
+    return buffer.getvalue()
+
+
+class ScheduleRenderer:
+    """Registry of served schedules plus a bounded cache of their rendered images."""
+
+    def __init__(self, max_schedules: int = 4096, max_image_bytes: int = 64 * 1024 * 1024, max_workers: int = 2):
+        self.max_schedules = max_schedules
+        self.max_image_bytes = max_image_bytes
+        self._schedules = OrderedDict()  # id -> (num_nurses, num_shifts, num_days, schedule)
+        self._images = OrderedDict()  # (id, fmt) -> bytes
+        self._image_bytes = 0
+        self._pending = {}  # (id, fmt) -> Future
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="render")
+
+    def register(self, num_nurses: int, num_shifts: int, num_days: int, schedule) -> str:
+        key = schedule_id(num_nurses, num_shifts, num_days, schedule)
+        with self._lock:
+            self._schedules[key] = (num_nurses, num_shifts, num_days, schedule)
+            self._schedules.move_to_end(key)
+            while len(self._schedules) > self.max_schedules:
+                self._schedules.popitem(last=False)
+        return key
+
+    def image(self, key: str, fmt: str) -> Optional[Future]:
+        """Future of the image bytes, or None for an unknown schedule."""
+        with self._lock:
+            cached = self._images.get((key, fmt))
+            if cached is not None:
+                self._images.move_to_end((key, fmt))
+                future = Future()
+                future.set_result(cached)
+                return future
+            pending = self._pending.get((key, fmt))
+            if pending is not None:
+                return pending
+            entry = self._schedules.get(key)
+            if entry is None:
+                return None
+            num_nurses, num_shifts, num_days, schedule = entry
+            future = self._executor.submit(render_schedule, schedule, num_days, num_shifts, num_nurses, fmt)
+            self._pending[(key, fmt)] = future
+        future.add_done_callback(lambda done: self._store((key, fmt), done))
+        return future
+
+    def _store(self, image_key, future):
+        with self._lock:
+            self._pending.pop(image_key, None)
+            if future.exception() is not None:
+                return
+            data = future.result()
+            if len(data) > self.max_image_bytes:
+                return
+            self._images[image_key] = data
+            self._image_bytes += len(data)
+            while self._image_bytes > self.max_image_bytes:
+                _, evicted = self._images.popitem(last=False)
+                self._image_bytes -= len(evicted)
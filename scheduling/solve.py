@@ -0,0 +1,135 @@
+"""Time-bounded CP-SAT solving with request-level options.
+
+Clients may pass an optional ``"solver"`` object with the payload:
+
+    {"time_limit": 10, "num_search_workers": 8, "relative_gap": 0.01, "symmetry_breaking": true}
+
+The solver stops at whichever of the time budget or the gap is reached first
+and the best schedule found so far is returned, optimal or not.
+``symmetry_breaking`` adds the constraints from scheduling.symmetry.
+"""
+import os
+import time
+
+from ortools.sat.python import cp_model
+
+from scheduling.model import ShiftModel, add_holidays, extract_schedule, set_objective
+from scheduling.problem import Problem
+from scheduling.symmetry import add_symmetry_breaking
+from scheduling.templates import ModelTemplateCache, default_cache
+
+DEFAULT_TIME_LIMIT = 60.0
+MAX_TIME_LIMIT = 300.0
+MAX_WORKERS = os.cpu_count() or 1
+
+
+def _option(raw: dict, key: str, default, cast):
+    value = raw.get(key, default)
+    if cast is int:
+        if isinstance(value, bool) or not isinstance(value, int):
+            raise ValueError(f"'{key}' must be an integer")
+    elif isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"'{key}' must be a number")
+    return cast(value)
+
+
+def solver_options(data: dict) -> dict:
+    """Validate the optional ``"solver"`` payload entry and fill in defaults.
+
+    Raises ValueError on an invalid option.
+    """
+    raw = data.get("solver") or {}
+    if not isinstance(raw, dict):
+        raise ValueError("'solver' must be an object")
+    unknown = set(raw) - {"time_limit", "num_search_workers", "relative_gap", "symmetry_breaking"}
+    if unknown:
+        raise ValueError(f"unknown solver options: {', '.join(sorted(unknown))}")
+
+    time_limit = _option(raw, "time_limit", DEFAULT_TIME_LIMIT, float)
+    if not 0 < time_limit <= MAX_TIME_LIMIT:
+        raise ValueError(f"'time_limit' must be in (0, {MAX_TIME_LIMIT}] seconds")
+    num_workers = _option(raw, "num_search_workers", MAX_WORKERS, int)
+    if num_workers < 1:
+        raise ValueError("'num_search_workers' must be at least 1")
+    num_workers = min(num_workers, MAX_WORKERS)
+    relative_gap = _option(raw, "relative_gap", 0.0, float)
+    if not 0 <= relative_gap < 1:
+        raise ValueError("'relative_gap' must be in [0, 1)")
+    symmetry_breaking = raw.get("symmetry_breaking", False)
+    if not isinstance(symmetry_breaking, bool):
+        raise ValueError("'symmetry_breaking' must be true or false")
+    options = {"time_limit": time_limit, "num_search_workers": num_workers, "relative_gap": relative_gap}
+    if symmetry_breaking:
+        # Only present when on, so solution-cache keys of other requests don't change.
+        options["symmetry_breaking"] = True
+    return options
+
+
+def make_solver(options: dict) -> cp_model.CpSolver:
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = options["time_limit"]
+    solver.parameters.num_workers = options["num_search_workers"]
+    solver.parameters.relative_gap_limit = options["relative_gap"]
+    return solver
+
+
+def relative_gap(objective: float, bound: float) -> float:
+    return abs(bound - objective) / max(1.0, abs(objective))
+
+
+def build_problem_model(problem: Problem, template_cache: ModelTemplateCache,
+                        symmetry_breaking: bool = False) -> ShiftModel:
+    """Copy the structural template for the problem's shape and add its requests."""
+    model, shifts = template_cache.get(problem.num_nurses, problem.num_shifts, problem.num_days)
+    add_holidays(model, shifts, problem.holiday_requests)
+    set_objective(model, shifts, problem.shift_requests)
+    if symmetry_breaking:
+        add_symmetry_breaking(model, shifts, problem)
+    return ShiftModel(model, shifts)
+
+
+def solve_problem(problem: Problem, options: dict, template_cache: ModelTemplateCache = default_cache) -> dict:
+    model, shifts = build_problem_model(problem, template_cache, options.get("symmetry_breaking", False))
+    return solve(model, shifts, options)
+
+
+def solve(model: cp_model.CpModel, shifts, options: dict, callback=None) -> dict:
+    """Solve ``model`` and return the best schedule found with its solver status."""
+    return run_solver(make_solver(options), model, shifts, callback)
+
+
+def run_solver(solver: cp_model.CpSolver, model: cp_model.CpModel, shifts, callback=None) -> dict:
+    """Like solve(), for a solver the caller configured or needs to stop."""
+    started = time.perf_counter()
+    status = solver.Solve(model, callback)
+    solved = time.perf_counter()
+
+    result = {
+        "solver_status": solver.StatusName(status),
+        "schedule": None,
+        "objective": None,
+        "bound": None,
+        "gap": None,
+        "wall_time": solver.WallTime(),
+    }
+    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        result["schedule"] = extract_schedule(solver, shifts)
+        result["objective"] = solver.ObjectiveValue()
+        result["bound"] = solver.BestObjectiveBound()
+        result["gap"] = relative_gap(result["objective"], result["bound"])
+    result["timings"] = {"solve": solved - started, "extract": time.perf_counter() - solved}
+    result["stats"] = solver_stats(solver, model)
+    return result
+
+
+def solver_stats(solver: cp_model.CpSolver, model: cp_model.CpModel) -> dict:
+    """Search statistics of the last solve, and the size of the model it solved."""
+    proto = model.Proto()
+    return {
+        "num_variables": len(proto.variables),
+        "num_constraints": len(proto.constraints),
+        "num_conflicts": solver.NumConflicts(),
+        "num_branches": solver.NumBranches(),
+        "wall_time": solver.WallTime(),
+        "user_time": solver.UserTime(),
+    }
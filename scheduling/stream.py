@@ -0,0 +1,74 @@
+"""Stream every improving CP-SAT solution while the search goes on.
+
+``stream_solve`` runs the solver on a background thread. A solution callback
+turns each improving solution into an event with its objective, bound,
+elapsed time and what changed since the previous one. The first solution
+sends the full schedule, and later ones send only ``added`` and ``removed``
+triples. If the consumer stops reading, the search is stopped.
+"""
+import queue
+import threading
+from typing import Iterator
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+from scheduling.model import assignments_from_solution, schedule_from_assignments, var_indices
+from scheduling.solve import make_solver, relative_gap, run_solver
+
+
+class SolutionStreamer(cp_model.CpSolverSolutionCallback):
+    """Push an event for every improving solution into ``events``."""
+
+    def __init__(self, shifts: np.ndarray, events: queue.Queue):
+        cp_model.CpSolverSolutionCallback.__init__(self)
+        self._index = var_indices(shifts)
+        self._events = events
+        self._previous = None
+        self._solution_count = 0
+
+    def on_solution_callback(self):
+        self._solution_count += 1
+        assigned = assignments_from_solution(self.Response().solution, self._index)
+        objective = self.ObjectiveValue()
+        bound = self.BestObjectiveBound()
+        event = {
+            "solution": self._solution_count,
+            "objective": objective,
+            "bound": bound,
+            "gap": relative_gap(objective, bound),
+            "elapsed": self.WallTime(),
+        }
+        if self._previous is None:
+            event["schedule"] = schedule_from_assignments(assigned)
+        else:
+            event["added"] = np.argwhere(assigned & ~self._previous).tolist()
+            event["removed"] = np.argwhere(self._previous & ~assigned).tolist()
+        self._previous = assigned
+        self._events.put(("solution", event))
+
+
+def stream_solve(model: cp_model.CpModel, shifts: np.ndarray, options: dict) -> Iterator[tuple]:
+    """Yield ``("solution", event)`` per improving solution, then ``("done", result)``."""
+    events = queue.Queue()
+    solver = make_solver(options)
+    callback = SolutionStreamer(shifts, events)
+
+    def search():
+        try:
+            events.put(("done", run_solver(solver, model, shifts, callback)))
+        except Exception as e:  # surface solver errors to the stream instead of hanging it
+            events.put(("error", {"error": str(e)}))
+
+    thread = threading.Thread(target=search, daemon=True)
+    thread.start()
+    try:
+        while True:
+            kind, payload = events.get()
+            yield kind, payload
+            if kind != "solution":
+                return
+    finally:
+        if thread.is_alive():
+            solver.StopSearch()
+        thread.join()
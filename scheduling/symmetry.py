@@ -0,0 +1,71 @@
+"""Symmetry breaking and implied constraints for faster proofs of optimality.
+
+Nurses whose ``shift_requests`` and ``holiday_requests`` rows are identical are
+interchangeable: swapping their rosters changes neither feasibility nor the
+objective. So CP-SAT may explore every permutation of them. Within each
+group of interchangeable nurses, each nurse's assignment vector is required
+to be lexicographically greater than or equal to the next one's, which keeps
+exactly one representative of every permutation.
+
+The redundant constraints only restate what coverage and fairness imply, as
+aggregates the LP relaxation can use directly: the number of nurses working
+each day, the total number of shifts, and each group's share of them.
+"""
+import numpy as np
+from ortools.sat.python import cp_model
+
+from scheduling.model import fairness_bounds
+from scheduling.problem import Problem
+
+
+def interchangeable_groups(problem: Problem) -> list:
+    """Arrays of nurse ids (at least two per group) with identical request rows."""
+    rows = np.concatenate([problem.shift_requests.reshape(problem.num_nurses, -1),
+                           (problem.holiday_requests == 1).astype(np.int64)], axis=1)
+    _, inverse, counts = np.unique(rows, axis=0, return_inverse=True, return_counts=True)
+    inverse = inverse.ravel()
+    return [np.flatnonzero(inverse == label) for label in np.flatnonzero(counts > 1)]
+
+
+def add_lex_greater_equal(model: cp_model.CpModel, x: list, y: list) -> None:
+    """Constrain the Boolean vector ``x`` to be lexicographically >= ``y``.
+
+    ``equal`` holds exactly while the prefixes seen so far are identical.
+    While it does, the next pair must satisfy ``x_k >= y_k``.
+    """
+    equal = None
+    for k, (xk, yk) in enumerate(zip(x, y)):
+        constraint = model.AddImplication(yk, xk)
+        if equal is not None:
+            constraint.OnlyEnforceIf(equal)
+        if k == len(x) - 1:
+            break
+        still_equal = model.NewBoolVar("")
+        # still_equal <=> equal and x_k == y_k, where x_k >= y_k already holds.
+        model.AddBoolOr([xk.Not(), yk]).OnlyEnforceIf(still_equal)
+        model.AddBoolOr([still_equal, xk, *([] if equal is None else [equal.Not()])])
+        model.AddBoolOr([still_equal, yk.Not(), *([] if equal is None else [equal.Not()])])
+        if equal is not None:
+            model.AddImplication(still_equal, equal)
+        equal = still_equal
+
+
+def add_symmetry_breaking(model: cp_model.CpModel, shifts: np.ndarray, problem: Problem) -> list:
+    """Add lex-leader and redundant constraints; return the interchangeable groups."""
+    num_nurses, num_days, num_shifts = shifts.shape
+    groups = interchangeable_groups(problem)
+    for group in groups:
+        for first, second in zip(group[:-1], group[1:]):
+            add_lex_greater_equal(model, shifts[first].ravel().tolist(), shifts[second].ravel().tolist())
+
+    # Every day exactly num_shifts nurses work, and num_days * num_shifts shifts in total.
+    for day in range(num_days):
+        model.Add(cp_model.LinearExpr.Sum(shifts[:, day].ravel().tolist()) == num_shifts)
+    model.Add(cp_model.LinearExpr.Sum(shifts.ravel().tolist()) == num_days * num_shifts)
+
+    # A group of g nurses works between g * min and g * max shifts between them.
+    min_shifts, max_shifts = fairness_bounds(num_nurses, num_shifts, num_days)
+    for group in groups:
+        model.AddLinearConstraint(cp_model.LinearExpr.Sum(shifts[group].ravel().tolist()),
+                                  len(group) * min_shifts, len(group) * max_shifts)
+    return groups
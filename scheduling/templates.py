@@ -0,0 +1,98 @@
+"""LRU cache of structural CP-SAT models keyed by problem shape.
+
+Most requests share ``(num_nurses, num_shifts, num_days)`` and only differ in
+``shift_requests`` and ``holiday_requests``. The shape-only part of the model
+(variables, coverage, at-most-one, fairness bounds, rest rule) is built once
+per shape; every request gets a clone of the template model and adds its own
+objective and holiday fixings on top.
+
+The ``shifts`` array handed out with a clone is the template's own. CP-SAT
+variables are identified by their proto index, which the clone preserves, so
+the same ``IntVar`` objects can be used to add constraints to, hint and read
+values from any clone. They must not be used to change the template itself.
+"""
+import threading
+from collections import OrderedDict
+
+from ortools.sat.python import cp_model
+
+from scheduling.model import ShiftModel, add_structural_constraints, new_shift_vars
+
+# Rough footprint of one variable (proto entry and IntVar wrapper) and of one
+# structural constraint. Counted rather than serialized, since the model proto
+# of newer OR-Tools releases isn't a protobuf message with ByteSize().
+_VAR_BYTES = 200
+_CONSTRAINT_BYTES = 24
+
+
+class ModelTemplateCache:
+    """Thread-safe LRU of structural models bounded by entries and estimated bytes."""
+
+    def __init__(self, max_entries: int = 32, max_bytes: int = 512 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._templates = OrderedDict()  # shape -> (ShiftModel, size in bytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, num_nurses: int, num_shifts: int, num_days: int) -> ShiftModel:
+        """Return a fresh model holding only the structural constraints for this shape."""
+        key = (num_nurses, num_shifts, num_days)
+        with self._lock:
+            entry = self._templates.get(key)
+            if entry is not None:
+                self._templates.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        if entry is None:
+            # Build outside the lock so a large shape doesn't block other requests.
+            entry = self._build(num_nurses, num_shifts, num_days)
+            self._store(key, entry)
+        template, _ = entry
+        return ShiftModel(template.model.Clone(), template.shifts)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._templates),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._templates.clear()
+            self._bytes = 0
+
+    @staticmethod
+    def _build(num_nurses, num_shifts, num_days):
+        model = cp_model.CpModel()
+        shifts = new_shift_vars(model, num_nurses, num_shifts, num_days)
+        add_structural_constraints(model, shifts)
+        proto = model.Proto()
+        size = len(proto.variables) * _VAR_BYTES + len(proto.constraints) * _CONSTRAINT_BYTES
+        return ShiftModel(model, shifts), size
+
+    def _store(self, key, entry):
+        _, size = entry
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._templates:
+                return
+            self._templates[key] = entry
+            self._bytes += size
+            while len(self._templates) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._templates.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+
+# Shared by everything that solves in this process: request threads and pool workers.
+default_cache = ModelTemplateCache()
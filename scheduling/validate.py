@@ -0,0 +1,65 @@
+"""Check schedules from any backend against the hard rules, with NumPy only.
+
+A schedule, whether a list of (nurse, day, shift) triples or a batch of
+annealing samples, becomes a boolean ``[.., n, d, s]`` tensor. Each rule is
+one vectorized pass over it, for any number of shifts:
+
+* ``coverage``: shifts with no nurse or more than one;
+* ``one_per_day``: shifts a nurse works beyond one on a day;
+* ``rest``: last shift of day d followed by the first shift of day d+1;
+* ``fairness``: shifts a nurse works outside the even-distribution bounds;
+* ``holidays``: shifts worked on a requested day off.
+"""
+import numpy as np
+
+from scheduling.model import fairness_bounds
+from scheduling.problem import Problem
+
+CONSTRAINTS = ("coverage", "one_per_day", "rest", "fairness", "holidays")
+
+
+def schedule_tensor(schedule, problem: Problem) -> np.ndarray:
+    """Boolean ``[n, d, s]`` array of a list of (nurse, day, shift) triples.
+
+    Raises ValueError if a triple is out of range.
+    """
+    shape = (problem.num_nurses, problem.num_days, problem.num_shifts)
+    assigned = np.zeros(shape, dtype=bool)
+    if len(schedule):
+        triples = np.asarray(schedule, dtype=np.int64).reshape(-1, 3)
+        if ((triples < 0) | (triples >= shape)).any():
+            raise ValueError("schedule refers to a nurse, day or shift out of range")
+        assigned[tuple(triples.T)] = True
+    return assigned
+
+
+def violation_counts(samples: np.ndarray, problem: Problem) -> dict:
+    """Violations of each rule, one count per row of a (reads, variables) 0/1 array."""
+    x = samples.reshape(-1, problem.num_nurses, problem.num_days, problem.num_shifts).astype(bool)
+    min_shifts, max_shifts = fairness_bounds(problem.num_nurses, problem.num_shifts, problem.num_days)
+    worked = x.sum(axis=(2, 3))
+    return {
+        "coverage": np.abs(x.sum(axis=1) - 1).sum(axis=(1, 2)),
+        "one_per_day": np.maximum(x.sum(axis=3) - 1, 0).sum(axis=(1, 2)),
+        "rest": (x[:, :, :-1, -1] & x[:, :, 1:, 0]).sum(axis=(1, 2)),
+        "fairness": (np.maximum(min_shifts - worked, 0) + np.maximum(worked - max_shifts, 0)).sum(axis=1),
+        "holidays": x[:, problem.holiday_requests == 1].sum(axis=(1, 2)),
+    }
+
+
+def hard_violations(samples: np.ndarray, problem: Problem) -> np.ndarray:
+    """Count the hard-constraint violations of every row of a (reads, variables) 0/1 array."""
+    return sum(violation_counts(samples, problem).values())
+
+
+def validate_schedule(schedule, problem: Problem) -> dict:
+    """Violations of each rule by a list of (nurse, day, shift) triples, plus their ``total``."""
+    counts = violation_counts(schedule_tensor(schedule, problem).reshape(1, -1), problem)
+    report = {name: int(counts[name][0]) for name in CONSTRAINTS}
+    report["total"] = sum(report.values())
+    return report
+
+
+def schedule_violations(schedule, problem: Problem) -> int:
+    """Hard-constraint violations of a list of (nurse, day, shift) triples."""
+    return validate_schedule(schedule, problem)["total"]
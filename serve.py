@@ -0,0 +1,104 @@
+"""Preforking production server for the scheduling API.
+
+    python serve.py --host 0.0.0.0 --port 8000 --workers 4 --warm 5x3x7 300x3x90
+
+The parent binds the listening socket, imports the app once (Flask, NumPy
+and OR-Tools) and builds the model templates of the ``--warm`` shapes. It
+then freezes the garbage collector and forks the workers. The workers share
+those pages copy-on-write, so a worker starts serving right away without
+importing anything, and a worker that dies is replaced just as fast. Each
+worker is a threaded WSGI server accepting on the shared socket.
+
+Job, rendered-image and metrics state lives in each worker. Clients that
+poll ``/schedule/jobs/<id>`` or fetch ``/schedule/<id>/image`` need
+``--workers 1`` or a proxy that routes them back to the same worker. With
+``SCHEDULE_CACHE_PATH`` set, the workers share the SQLite solution cache.
+"""
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+
+
+def _shape(value: str) -> tuple:
+    try:
+        num_nurses, num_shifts, num_days = (int(v) for v in value.split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected NURSESxSHIFTSxDAYS, got {value!r}") from None
+    return num_nurses, num_shifts, num_days
+
+
+def _serve(sock: socket.socket, app) -> None:
+    """Worker body: serve requests on the inherited socket until terminated."""
+    from werkzeug.serving import make_server
+
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    host, port = sock.getsockname()[:2]
+    make_server(host, port, app, threaded=True, fd=sock.fileno()).serve_forever()
+
+
+def _spawn(sock: socket.socket, app) -> int:
+    pid = os.fork()
+    if pid == 0:
+        try:
+            _serve(sock, app)
+        finally:
+            os._exit(1)
+    return pid
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--backlog", type=int, default=128)
+    parser.add_argument("--warm", nargs="*", type=_shape, default=[],
+                        help="problem shapes as NURSESxSHIFTSxDAYS whose model templates are built before forking")
+    args = parser.parse_args()
+
+    sock = socket.create_server((args.host, args.port), backlog=args.backlog)
+    sock.set_inheritable(True)
+
+    started = time.perf_counter()
+    from app import app, template_cache
+    for shape in args.warm:
+        template_cache.get(*shape)
+    # Objects loaded so far are never collected, so the GC doesn't touch
+    # (and copy) their pages in the workers.
+    gc.collect()
+    gc.freeze()
+    print(f"loaded in {time.perf_counter() - started:.2f}s, serving on http://{args.host}:{args.port} "
+          f"with {args.workers} workers", file=sys.stderr, flush=True)
+
+    workers = {_spawn(sock, app) for _ in range(args.workers)}
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        workers.discard(pid)
+        if not stopping:
+            print(f"worker {pid} exited with status {status}, restarting", file=sys.stderr, flush=True)
+            workers.add(_spawn(sock, app))
+
+
+if __name__ == "__main__":
+    main()